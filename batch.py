@@ -0,0 +1,117 @@
+from collections import deque
+import heapq
+import itertools
+
+from engine import SearchBuffers, SearchResult, unwind_path
+
+
+class BatchSearch:
+    def __init__(self, grid):
+        self.grid = grid
+        self.buffers = SearchBuffers(grid.size)
+
+    def path(self, source, target):
+        return unwind_path(self.grid, self.buffers.parent, source, target)
+
+    def astar(self, source, target):
+        grid = self.grid
+        width = grid.width
+        blocked = grid.blocked
+        offsets = grid.offsets
+        buffers = self.buffers
+        seen, closed, parent, g = buffers.seen, buffers.closed, buffers.parent, buffers.g
+        generation = buffers.next_generation()
+        end_row, end_col = divmod(target, width)
+        heap = [(0, 0, source)]
+        counter = itertools.count(1)
+        seen[source] = generation
+        g[source] = 0
+        expanded = 0
+        pushes = 1
+        stale = 0
+        max_frontier = 0
+        while heap:
+            if len(heap) > max_frontier:
+                max_frontier = len(heap)
+            _, _, current = heapq.heappop(heap)
+            if closed[current] == generation:
+                stale += 1
+                continue
+            closed[current] = generation
+            expanded += 1
+            if current == target:
+                return SearchResult(self.path(source, target), expanded, max_frontier, pushes, stale)
+            tentative_g = g[current] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if blocked[neighbor]:
+                    continue
+                if seen[neighbor] != generation or tentative_g < g[neighbor]:
+                    seen[neighbor] = generation
+                    g[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    row, col = divmod(neighbor, width)
+                    heapq.heappush(heap, (tentative_g + abs(row - end_row) + abs(col - end_col), next(counter), neighbor))
+                    pushes += 1
+        return SearchResult(None, expanded, max_frontier, pushes, stale)
+
+    def bfs(self, source, targets):
+        blocked = self.grid.blocked
+        offsets = self.grid.offsets
+        buffers = self.buffers
+        seen, parent = buffers.seen, buffers.parent
+        generation = buffers.next_generation()
+        remaining = set(targets)
+        queue = deque([source])
+        seen[source] = generation
+        expanded = 0
+        pushes = 1
+        max_frontier = 0
+        while queue:
+            if len(queue) > max_frontier:
+                max_frontier = len(queue)
+            current = queue.popleft()
+            expanded += 1
+            if current in remaining:
+                remaining.discard(current)
+                yield current, SearchResult(self.path(source, current), expanded, max_frontier, pushes)
+                if not remaining:
+                    return
+            for offset in offsets:
+                neighbor = current + offset
+                if not blocked[neighbor] and seen[neighbor] != generation:
+                    seen[neighbor] = generation
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+                    pushes += 1
+        for target in remaining:
+            yield target, SearchResult(None, expanded, max_frontier, pushes)
+
+    def search(self, pairs):
+        grid = self.grid
+        blocked = grid.blocked
+        pairs = [(grid.index(source), grid.index(target)) for source, target in pairs]
+        reverse = len({target for _, target in pairs}) < len({source for source, _ in pairs})
+        groups = {}
+        for i, (source, target) in enumerate(pairs):
+            if blocked[source] or blocked[target]:
+                yield i, SearchResult(None, 0)
+                continue
+            if reverse:
+                source, target = target, source
+            groups.setdefault(source, {}).setdefault(target, []).append(i)
+        for source, targets in groups.items():
+            if len(targets) == 1:
+                target, = targets
+                results = [(target, self.astar(source, target))]
+            else:
+                results = self.bfs(source, targets)
+            for target, result in results:
+                if reverse and result.path is not None:
+                    result.path.reverse()
+                for i in targets[target]:
+                    yield i, result
+
+
+def search_pairs(grid, pairs):
+    return BatchSearch(grid).search(pairs)
@@ -0,0 +1,226 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import engine
+from batch import BatchSearch
+from cellgrid import CellGrid
+from generators import generate_random_obstacles, generate_random_terrain, recursive_division_maze
+import maps
+
+SIZES = [100, 500, 1000, 2000, 4000]
+QUICK_SIZES = [100, 500]
+DENSITIES = [0.1, 0.25, 0.35]
+TERRAIN_DENSITIES = [0.1]
+FIELDS = ["map", "size", "algorithm", "time", "expanded", "pushes", "stale", "max_frontier", "path_length", "peak_memory"]
+SCENARIO_FIELDS = ["bucket", "start", "goal", "algorithm", "time", "expanded", "path_length", "optimal", "ratio"]
+
+
+def build_map(kind, size, seed):
+    grid = CellGrid(size, size)
+    random.seed(seed)
+    if kind == "maze":
+        recursive_division_maze(grid, (1, 1), [], (size - 2, size - 2))
+    else:
+        generate_random_obstacles(grid, (0, 0), [], (size - 1, size - 1), density=float(kind.split("-")[1]))
+        if kind.startswith("terrain-"):
+            generate_random_terrain(grid)
+    blocked = grid.blocked()
+    start, end = maps.endpoints(blocked)
+    return engine.OccupancyGrid(blocked, grid.weights), start, end
+
+
+def measure(grid, start, end, algorithm, memory=True):
+    began = time.perf_counter()
+    result = engine.search(grid, start, end, algorithm)
+    elapsed = time.perf_counter() - began
+    peak = None
+    if memory:
+        tracemalloc.start()
+        engine.search(grid, start, end, algorithm)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "time": elapsed,
+        "expanded": result.expanded,
+        "pushes": result.pushes,
+        "stale": result.stale,
+        "max_frontier": result.max_frontier,
+        "path_length": result.cost,
+        "peak_memory": peak,
+    }
+
+
+def run_suite(sizes, maps, algorithms, seed=0, memory=True, log=None):
+    records = []
+    for size in sizes:
+        for kind in maps:
+            grid, start, end = build_map(kind, size, seed)
+            for algorithm in algorithms:
+                record = {"map": kind, "size": size, "algorithm": algorithm}
+                record.update(measure(grid, start, end, algorithm, memory))
+                records.append(record)
+                if log:
+                    log(record)
+    return records
+
+
+def scenario_map(scen_path, scenarios, map_path=None, shape=None):
+    if map_path is None:
+        map_path = os.path.join(os.path.dirname(scen_path), os.path.basename(scenarios[0].map_name))
+    return engine.OccupancyGrid(maps.load_map(map_path, shape))
+
+
+def timed_results(grid, scenarios, algorithm):
+    if algorithm == "batch":
+        results = BatchSearch(grid).search([(scenario.start, scenario.goal) for scenario in scenarios])
+        began = time.perf_counter()
+        for i, result in results:
+            finished = time.perf_counter()
+            yield scenarios[i], result, finished - began
+            began = time.perf_counter()
+        return
+    for scenario in scenarios:
+        began = time.perf_counter()
+        result = engine.search(grid, scenario.start, scenario.goal, algorithm)
+        yield scenario, result, time.perf_counter() - began
+
+
+def run_scenarios(grid, scenarios, algorithm, log=None):
+    records = []
+    for scenario, result, elapsed in timed_results(grid, scenarios, algorithm):
+        ratio = None
+        if result.found and scenario.optimal > 0:
+            ratio = result.cost / scenario.optimal
+        record = {
+            "bucket": scenario.bucket,
+            "start": list(scenario.start),
+            "goal": list(scenario.goal),
+            "algorithm": algorithm,
+            "time": elapsed,
+            "expanded": result.expanded,
+            "path_length": result.cost,
+            "optimal": scenario.optimal,
+            "ratio": ratio,
+        }
+        records.append(record)
+        if log:
+            log(record)
+    return records
+
+
+def summarize_scenarios(records):
+    buckets = {}
+    for record in records:
+        buckets.setdefault((record["algorithm"], record["bucket"]), []).append(record)
+    lines = []
+    for (algorithm, bucket), group in sorted(buckets.items()):
+        ratios = [record["ratio"] for record in group if record["ratio"] is not None]
+        unsolved = sum(record["path_length"] is None for record in group)
+        lines.append("%-14s bucket %3d %5d queries %9.4fs %10d expanded  ratio mean %s max %s%s" % (
+            algorithm, bucket, len(group), sum(record["time"] for record in group),
+            sum(record["expanded"] for record in group),
+            "%.3f" % (sum(ratios) / len(ratios)) if ratios else "-",
+            "%.3f" % max(ratios) if ratios else "-",
+            "  %d unsolved" % unsolved if unsolved else "",
+        ))
+    return lines
+
+
+def compare(records, baseline, threshold):
+    previous = {(r["map"], r["size"], r["algorithm"]): r for r in baseline["results"]}
+    problems = []
+    for record in records:
+        old = previous.get((record["map"], record["size"], record["algorithm"]))
+        if old is None:
+            continue
+        name = "%s/%d/%s" % (record["map"], record["size"], record["algorithm"])
+        if record["path_length"] != old["path_length"]:
+            problems.append("%s: path length %s -> %s" % (name, old["path_length"], record["path_length"]))
+        if old["time"] > 0 and record["time"] > old["time"] * (1 + threshold):
+            problems.append("%s: time %.4fs -> %.4fs" % (name, old["time"], record["time"]))
+        if record["expanded"] > old["expanded"] * (1 + threshold):
+            problems.append("%s: expanded %d -> %d" % (name, old["expanded"], record["expanded"]))
+    return problems
+
+
+def write_csv(path, records, fields=FIELDS):
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def format_record(record):
+    memory = "-" if record["peak_memory"] is None else "%.1fMB" % (record["peak_memory"] / 1e6)
+    return "%-10s %5d %-14s %9.4fs %10d expanded %9d frontier %8s length %8s" % (
+        record["map"], record["size"], record["algorithm"], record["time"], record["expanded"],
+        record["max_frontier"], record["path_length"], memory,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the search engine on generated maps.")
+    parser.add_argument("--sizes", type=lambda text: [int(v) for v in text.split(",")], default=None)
+    parser.add_argument("--quick", action="store_true", help="only run the %s grid sizes" % QUICK_SIZES)
+    parser.add_argument("--maps", default=",".join(["random-%s" % d for d in DENSITIES] + ["maze"]
+                                                   + ["terrain-%s" % d for d in TERRAIN_DENSITIES]))
+    parser.add_argument("--algorithms", default=",".join(engine.ALGORITHMS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--json", help="write results as JSON")
+    parser.add_argument("--csv", help="write results as CSV")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--scen", help="run every query of a MovingAI .scen file instead of generated maps; "
+                                       "'batch' in --algorithms runs them through the batch API")
+    parser.add_argument("--map", help="map for --scen (default: the map named in the scenario file)")
+    parser.add_argument("--shape", type=lambda text: tuple(int(v) for v in text.split("x")),
+                        help="ROWSxCOLS of a raw binary --map")
+    args = parser.parse_args(argv)
+
+    if args.scen:
+        scenarios = maps.read_scenarios(args.scen)
+        if not scenarios:
+            parser.error("%s contains no scenarios" % args.scen)
+        grid = scenario_map(args.scen, scenarios, args.map, args.shape)
+        records = []
+        for algorithm in args.algorithms.split(","):
+            records += run_scenarios(grid, scenarios, algorithm)
+        for line in summarize_scenarios(records):
+            print(line)
+        if args.json:
+            with open(args.json, "w") as handle:
+                json.dump({"python": platform.python_version(), "scen": args.scen, "results": records}, handle, indent=2)
+        if args.csv:
+            write_csv(args.csv, records, SCENARIO_FIELDS)
+        return 0
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    records = run_suite(sizes, args.maps.split(","), args.algorithms.split(","), args.seed,
+                        not args.no_memory, log=lambda record: print(format_record(record), flush=True))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump({"python": platform.python_version(), "seed": args.seed, "results": records}, handle, indent=2)
+    if args.csv:
+        write_csv(args.csv, records)
+    if args.baseline:
+        with open(args.baseline) as handle:
+            problems = compare(records, json.load(handle), args.threshold)
+        for problem in problems:
+            print("REGRESSION " + problem)
+        if problems:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+
+import engine
+
+ENTRY_BYTES = 128
+CELL_BYTES = 72
+
+
+class PathCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def entry_size(result):
+        return ENTRY_BYTES + CELL_BYTES * len(result.path or ())
+
+    def get(self, version, algorithm, source, target):
+        key = (version, algorithm, source, target)
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, version, algorithm, source, target, result):
+        key = (version, algorithm, source, target)
+        size = self.entry_size(result)
+        if size > self.max_bytes:
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= self.entry_size(previous)
+        self.entries[key] = result
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= self.entry_size(evicted)
+
+    def search(self, version, grid, source, target, algorithm="astar"):
+        result = self.get(version, algorithm, source, target)
+        if result is None:
+            result = engine.search(grid, source, target, algorithm)
+            self.put(version, algorithm, source, target, result)
+        return result
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return "cache %d hits / %d misses" % (self.hits, self.misses)
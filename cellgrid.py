@@ -0,0 +1,108 @@
+import itertools
+
+import numpy as np
+
+FREE = 0
+OBSTACLE = 1
+START = 2
+STOP = 3
+END = 4
+PATH = 5
+
+SEARCH_KINDS = ("QUEUE", "VISITED", "QUEUE_END", "VISITED_END")
+PALETTES = 2
+SEARCH_STATES = [
+    {kind: PATH + 1 + p * len(SEARCH_KINDS) + i for i, kind in enumerate(SEARCH_KINDS)}
+    for p in range(PALETTES)
+]
+MAX_WEIGHT = 9
+TERRAIN_STATES = {
+    weight: PATH + 1 + PALETTES * len(SEARCH_KINDS) + weight - 2 for weight in range(2, MAX_WEIGHT + 1)
+}
+TERRAIN = np.array([FREE, FREE] + list(TERRAIN_STATES.values()), dtype=np.uint8)
+STATE_COUNT = PATH + 1 + PALETTES * len(SEARCH_KINDS) + len(TERRAIN_STATES)
+REPAINT_THRESHOLD = 4096
+
+_versions = itertools.count(1)
+
+
+def is_open(state):
+    return (state == FREE) | (state >= TERRAIN_STATES[2])
+
+
+class CellGrid:
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.state = np.zeros((rows, cols), dtype=np.uint8)
+        self.weights = np.ones((rows, cols), dtype=np.uint8)
+        self.changed = set()
+        self.repaint = True
+        self.version = next(_versions)
+
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
+
+    def get(self, pos):
+        return int(self.state[pos])
+
+    def set(self, pos, value):
+        if value == FREE:
+            value = TERRAIN[self.weights[pos]]
+        previous = self.state[pos]
+        if previous != value:
+            if previous == OBSTACLE or value == OBSTACLE:
+                self.version = next(_versions)
+            self.state[pos] = value
+            self.changed.add(pos)
+
+    def is_obstacle(self, pos):
+        return self.state[pos] == OBSTACLE
+
+    def is_special(self, pos):
+        return START <= self.state[pos] <= END
+
+    def set_weight(self, pos, weight):
+        if self.weights[pos] == weight:
+            return
+        self.weights[pos] = weight
+        self.version = next(_versions)
+        if is_open(self.state[pos]):
+            self.state[pos] = TERRAIN[weight]
+            self.changed.add(pos)
+
+    def fill_weights(self, weights):
+        self.weights[...] = weights
+        self.version = next(_versions)
+        mask = is_open(self.state)
+        self.state[mask] = TERRAIN[self.weights[mask]]
+        self.repaint = True
+
+    def blocked(self):
+        return self.state == OBSTACLE
+
+    def fill(self, mask, value):
+        if value == OBSTACLE or np.any(self.state[mask] == OBSTACLE):
+            self.version = next(_versions)
+        if value == FREE:
+            self.state[mask] = TERRAIN[self.weights[mask]]
+        else:
+            self.state[mask] = value
+        self.repaint = True
+
+    def put(self, indices, values):
+        flat = self.state.reshape(-1)
+        if np.any(values == OBSTACLE) or np.any(flat[indices] == OBSTACLE):
+            self.version = next(_versions)
+        flat[indices] = values
+        if len(indices) >= REPAINT_THRESHOLD:
+            self.repaint = True
+        else:
+            rows, cols = np.divmod(indices, self.cols)
+            self.changed.update(zip(rows.tolist(), cols.tolist()))
+
+    def clear_search(self):
+        self.fill(self.state >= PATH, FREE)
+
+    def clear(self):
+        self.fill((self.state < START) | (self.state > END), FREE)
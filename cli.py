@@ -0,0 +1,141 @@
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+import engine
+from generators import division_walls, random_obstacle_mask, random_terrain_weights
+from hierarchy import HierarchicalGrid
+import maps
+from parallel import RoutePool
+import routing
+
+ALGORITHMS = sorted(engine.ALGORITHMS) + ["hpa"]
+
+
+def parse_points(text):
+    return [tuple(int(v) for v in point.split(",")) for point in text.split(";")]
+
+
+def generate_map(kind, rows, cols, seed, protected=()):
+    random.seed(seed)
+    if kind == "empty":
+        return np.zeros((rows, cols), dtype=bool), None
+    if kind == "maze":
+        blocked = np.zeros(rows * cols, dtype=bool)
+        blocked[division_walls(rows, cols, protected)] = True
+        return blocked.reshape(rows, cols), None
+    if kind.startswith("random-"):
+        return random_obstacle_mask(rows, cols, protected, float(kind.split("-")[1])), None
+    if kind.startswith("terrain-"):
+        blocked = random_obstacle_mask(rows, cols, protected, float(kind.split("-")[1]))
+        return blocked, random_terrain_weights(rows, cols)
+    raise ValueError("unknown map kind %r (use empty, maze, random-DENSITY or terrain-DENSITY)" % kind)
+
+
+def solve(grid, points, algorithm, pool=None):
+    if pool is not None:
+        return pool.solve_route(points, algorithm)
+    if algorithm != "hpa":
+        return engine.solve_route(grid, points, algorithm)
+    hierarchy = HierarchicalGrid(grid)
+    results = []
+    for i in range(len(points) - 1):
+        began = time.perf_counter()
+        result = hierarchy.search(points[i], points[i + 1])
+        result.elapsed = time.perf_counter() - began
+        results.append(result)
+        if not result.found:
+            break
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find paths on a grid without opening the visualizer.")
+    parser.add_argument("--map", help="MovingAI .map, .npy or raw binary occupancy grid to load")
+    parser.add_argument("--shape", type=lambda text: tuple(int(v) for v in text.split("x")),
+                        help="ROWSxCOLS of a raw binary --map")
+    parser.add_argument("--generate", default="random-0.25",
+                        help="map to generate when no --map is given: empty, maze, random-DENSITY or terrain-DENSITY")
+    parser.add_argument("--weights", help=".npy or raw uint8 terrain costs (0 blocks a cell)")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--cols", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--points", type=parse_points,
+                        help="route as ROW,COL;ROW,COL;... (default: two far corners of the largest open region)")
+    parser.add_argument("--algorithm", default="astar", choices=ALGORITHMS)
+    parser.add_argument("--optimize-order", action="store_true", help="visit the stops in the shortest order")
+    parser.add_argument("--workers", type=int, help="solve the legs and the stop order in this many processes")
+    parser.add_argument("--paths", action="store_true", help="print every cell of each leg")
+    parser.add_argument("--json", help="write the route as JSON")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers and args.algorithm == "hpa":
+        parser.error("--workers does not support hpa")
+
+    began = time.perf_counter()
+    if args.map:
+        blocked = np.asarray(maps.load_map(args.map, args.shape), dtype=bool)
+        weights = None
+    else:
+        for point in args.points or ():
+            if not (0 <= point[0] < args.rows and 0 <= point[1] < args.cols):
+                parser.error("%s is outside the %dx%d grid" % (point, args.rows, args.cols))
+        try:
+            blocked, weights = generate_map(args.generate, args.rows, args.cols, args.seed, args.points or ())
+        except ValueError as error:
+            parser.error(str(error))
+    if args.weights:
+        walls, weights = maps.load_weights(args.weights, args.shape or blocked.shape)
+        blocked = blocked | walls
+    grid = engine.OccupancyGrid(blocked, weights)
+    if not args.points and blocked.all():
+        parser.error("the map has no free cells to route between")
+    points = args.points or list(maps.endpoints(blocked))
+    for point in points:
+        if not grid.in_bounds(point):
+            parser.error("%s is outside the %dx%d grid" % (point, grid.rows, grid.cols))
+        if grid.is_blocked(point):
+            parser.error("%s is a blocked cell" % (point,))
+    loaded = time.perf_counter() - began
+    pool = RoutePool(blocked, args.workers, weights) if args.workers else None
+    try:
+        if args.optimize_order and len(points) > 3:
+            ordered, _ = routing.order_stops(grid, points[0], points[1:-1], points[-1], pool=pool)
+            if ordered is not None:
+                points = [points[0]] + ordered + [points[-1]]
+
+        began = time.perf_counter()
+        results = solve(grid, points, args.algorithm, pool)
+        searched = time.perf_counter() - began
+    finally:
+        if pool is not None:
+            pool.close()
+
+    legs = []
+    for i, result in enumerate(results):
+        source, target = points[i], points[i + 1]
+        print("leg %d %s -> %s: %s, %d expanded, %.3f ms" % (
+            i + 1, source, target, "cost %d" % result.cost if result.found else "no path",
+            result.expanded, 1000 * result.elapsed))
+        if args.paths and result.found:
+            print("  " + " ".join("%d,%d" % pos for pos in result.path))
+        leg = {"from": list(source), "to": list(target), "path": result.path and [list(pos) for pos in result.path]}
+        leg.update(result.stats())
+        legs.append(leg)
+    found = len(results) == len(points) - 1 and all(result.found for result in results)
+    print("%s %dx%d, %s, route cost %s, load %.3f s, search %.3f s" % (
+        args.map or args.generate, grid.rows, grid.cols, args.algorithm,
+        sum(result.cost for result in results) if found else "-", loaded, searched))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump({"algorithm": args.algorithm, "points": [list(p) for p in points], "legs": legs}, handle)
+    return 0 if found else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import numpy as np
+
+
+def label_components(blocked):
+    blocked = np.asarray(blocked, dtype=bool)
+    rows, cols = blocked.shape
+    ids = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+    free = ~blocked
+    horizontal = free[:, :-1] & free[:, 1:]
+    vertical = free[:-1, :] & free[1:, :]
+    u = np.concatenate([ids[:, :-1][horizontal], ids[:-1, :][vertical]])
+    v = np.concatenate([ids[:, 1:][horizontal], ids[1:, :][vertical]])
+    parent = ids.ravel().copy()
+    while u.size:
+        pu = parent[u]
+        pv = parent[v]
+        crossing = pu != pv
+        if not crossing.any():
+            break
+        u, v, pu, pv = u[crossing], v[crossing], pu[crossing], pv[crossing]
+        parent[np.maximum(pu, pv)] = np.minimum(pu, pv)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+class ComponentIndex:
+    def __init__(self, blocked):
+        self.blocked = np.array(blocked, dtype=bool)
+        self.rows, self.cols = self.blocked.shape
+        self.rebuild()
+
+    def rebuild(self):
+        self.parent = memoryview(label_components(self.blocked))
+        self.stale = False
+
+    def find(self, cell):
+        parent = self.parent
+        root = cell
+        while parent[root] != root:
+            root = parent[root]
+        while parent[cell] != root:
+            parent[cell], cell = root, parent[cell]
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+    def update(self, changes):
+        for pos, blocked in changes:
+            if self.blocked[pos] == blocked:
+                continue
+            self.blocked[pos] = blocked
+            if blocked:
+                self.stale = True
+                continue
+            row, col = pos
+            cell = row * self.cols + col
+            for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+                r, c = row + dr, col + dc
+                if 0 <= r < self.rows and 0 <= c < self.cols and not self.blocked[r, c]:
+                    self.union(cell, r * self.cols + c)
+
+    def connected(self, a, b):
+        if self.blocked[a] or self.blocked[b]:
+            return False
+        a = a[0] * self.cols + a[1]
+        b = b[0] * self.cols + b[1]
+        if self.find(a) != self.find(b):
+            return False
+        if self.stale:
+            self.rebuild()
+            return self.find(a) == self.find(b)
+        return True
@@ -0,0 +1,884 @@
+from collections import deque
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+from components import label_components
+
+QUEUE = "QUEUE"
+VISITED = "VISITED"
+QUEUE_END = "QUEUE_END"
+VISITED_END = "VISITED_END"
+
+UNREACHABLE = -1
+WALL = -2
+LANDMARKS = 8
+STAMP_LIMIT = 2 ** 32 - 1
+
+
+class OccupancyGrid:
+    def __init__(self, blocked, weights=None):
+        blocked = np.asarray(blocked, dtype=bool)
+        self.rows, self.cols = blocked.shape
+        self.width = self.cols + 2
+        padded = np.ones((self.rows + 2, self.width), dtype=np.uint8)
+        padded[1:-1, 1:-1] = blocked
+        self.walls = padded.ravel()
+        self.blocked = self.walls.tobytes()
+        self.size = len(self.blocked)
+        self.offsets = (1, self.width, -1, -self.width)
+        self.landmark_table = None
+        self.buffer_pool = []
+        padded = np.ones((self.rows + 2, self.width), dtype=np.uint8)
+        self.min_cost = self.max_cost = 1
+        if weights is not None:
+            weights = np.maximum(np.asarray(weights, dtype=np.uint8), 1)
+            padded[1:-1, 1:-1] = weights
+            if not blocked.all():
+                self.min_cost = int(weights[~blocked].min())
+                self.max_cost = int(weights[~blocked].max())
+        self.costs = padded.tobytes()
+
+    def index(self, pos):
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def pos(self, index):
+        row, col = divmod(index, self.width)
+        return (row - 1, col - 1)
+
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
+
+    def is_blocked(self, pos):
+        return self.blocked[self.index(pos)] != 0
+
+    def neighbors(self, pos):
+        index = self.index(pos)
+        blocked = self.blocked
+        return [self.pos(index + offset) for offset in self.offsets if not blocked[index + offset]]
+
+    def unpad(self, flat):
+        return flat.reshape(self.rows + 2, self.width)[1:-1, 1:-1]
+
+    def landmarks(self):
+        if self.landmark_table is None:
+            self.landmark_table = LandmarkTable(self)
+        return self.landmark_table
+
+
+class DistanceField:
+    def __init__(self, grid, source, distances):
+        self.grid = grid
+        self.source = source
+        self.distances = distances
+
+    def distance(self, pos):
+        value = int(self.distances[self.grid.index(pos)])
+        return value if value >= 0 else None
+
+    def reachable(self, pos):
+        return self.distances[self.grid.index(pos)] >= 0
+
+    def as_array(self):
+        field = self.grid.unpad(self.distances).copy()
+        field[field < 0] = UNREACHABLE
+        return field
+
+    def path_to(self, target):
+        distances = self.distances
+        offsets = self.grid.offsets
+        node = self.grid.index(target)
+        remaining = int(distances[node])
+        if remaining < 0:
+            return None
+        path = [self.grid.pos(node)]
+        while remaining > 0:
+            remaining -= 1
+            for offset in offsets:
+                if distances[node + offset] == remaining:
+                    node += offset
+                    break
+            path.append(self.grid.pos(node))
+        path.reverse()
+        return path
+
+
+class LandmarkTable:
+    def __init__(self, grid, count=LANDMARKS):
+        self.grid = grid
+        free = grid.walls == 0
+        labels = label_components(grid.walls.reshape(grid.rows + 2, grid.width) != 0)
+        member = np.zeros(grid.size, dtype=bool)
+        if free.any():
+            member = free & (labels == np.bincount(labels[free]).argmax())
+        self.landmarks = []
+        distances = []
+        if member.any():
+            nearest = run(wavefronts(grid, grid.pos(int(np.flatnonzero(member)[0]))))
+            while len(distances) < count:
+                landmark = int(np.argmax(np.where(member, nearest, -1)))
+                if distances and nearest[landmark] <= 0:
+                    break
+                field = run(wavefronts(grid, grid.pos(landmark)))
+                self.landmarks.append(grid.pos(landmark))
+                distances.append(field)
+                nearest = field if len(distances) == 1 else np.minimum(nearest, field)
+        longest = max((int(field.max()) for field in distances), default=0)
+        self.dtype = np.uint16 if longest < np.iinfo(np.uint16).max else np.uint32
+        self.missing = np.iinfo(self.dtype).max
+        self.tables = np.full((len(distances), grid.size), self.missing, dtype=self.dtype)
+        for table, field in zip(self.tables, distances):
+            table[field >= 0] = field[field >= 0]
+        self.rows, self.cols = np.divmod(np.arange(grid.size, dtype=np.int32), grid.width)
+
+    def bounds(self, end):
+        target = self.grid.index(end)
+        end_row, end_col = divmod(target, self.grid.width)
+        bounds = np.abs(self.rows - end_row) + np.abs(self.cols - end_col)
+        for table in self.tables:
+            to_target = int(table[target])
+            if to_target != self.missing:
+                np.maximum(bounds, np.abs(table.astype(np.int32) - to_target), out=bounds)
+        return memoryview(bounds)
+
+
+def cell_buffer(size, dtype):
+    return memoryview(np.zeros(size, dtype=dtype))
+
+
+class IndexedHeap:
+    def __init__(self, size):
+        self.cells = []
+        self.keys = cell_buffer(size, np.int64)
+        self.slot = cell_buffer(size, np.int32)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def clear(self):
+        del self.cells[:]
+
+    def push(self, cell, key):
+        cells = self.cells
+        self.keys[cell] = key
+        cells.append(cell)
+        self.sift_up(len(cells) - 1, cell, key)
+
+    def decrease(self, cell, key):
+        self.keys[cell] = key
+        self.sift_up(self.slot[cell], cell, key)
+
+    def sift_up(self, i, cell, key):
+        cells, keys, slot = self.cells, self.keys, self.slot
+        while i:
+            up = (i - 1) >> 1
+            other = cells[up]
+            if keys[other] <= key:
+                break
+            cells[i] = other
+            slot[other] = i
+            i = up
+        cells[i] = cell
+        slot[cell] = i
+
+    def pop(self):
+        cells, keys, slot = self.cells, self.keys, self.slot
+        top = cells[0]
+        last = cells.pop()
+        count = len(cells)
+        if count:
+            i = 0
+            child = 1
+            while child < count:
+                other = cells[child]
+                if child + 1 < count and keys[cells[child + 1]] < keys[other]:
+                    child += 1
+                    other = cells[child]
+                cells[i] = other
+                slot[other] = i
+                i = child
+                child = 2 * i + 1
+            self.sift_up(i, last, keys[last])
+        return top
+
+
+class SearchBuffers:
+    def __init__(self, size):
+        self.size = size
+        self.generation = 0
+        self.seen = cell_buffer(size, np.uint32)
+        self.closed = cell_buffer(size, np.uint32)
+        self.g = cell_buffer(size, np.int32)
+        self.parent = cell_buffer(size, np.int32)
+        self.heap = IndexedHeap(size)
+
+    def next_generation(self):
+        self.generation += 1
+        if self.generation == STAMP_LIMIT:
+            self.seen = cell_buffer(self.size, np.uint32)
+            self.closed = cell_buffer(self.size, np.uint32)
+            self.generation = 1
+        self.heap.clear()
+        return self.generation
+
+
+class SearchResult:
+    def __init__(self, path, expanded, max_frontier=0, pushes=0, stale=0, cost=None):
+        self.path = path
+        self.path_cost = cost
+        self.expanded = expanded
+        self.max_frontier = max_frontier
+        self.pushes = pushes
+        self.stale = stale
+        self.elapsed = None
+
+    @property
+    def found(self):
+        return self.path is not None
+
+    @property
+    def cost(self):
+        if self.path is None:
+            return None
+        if self.path_cost is not None:
+            return self.path_cost
+        return len(self.path) - 1
+
+    def stats(self):
+        return {
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "stale": self.stale,
+            "max_frontier": self.max_frontier,
+            "cost": self.cost,
+            "elapsed": self.elapsed,
+        }
+
+    def __repr__(self):
+        return "SearchResult(cost=%r, expanded=%r)" % (self.cost, self.expanded)
+
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def reconstruct_path(grid, parent, start, end):
+    path = []
+    node = end
+    while node != start:
+        path.append(grid.pos(node))
+        node = parent.get(node)
+        if node is None:
+            return None
+    path.append(grid.pos(start))
+    path.reverse()
+    return path
+
+
+def unwind_path(grid, parent, start, end):
+    path = [grid.pos(end)]
+    node = end
+    while node != start:
+        node = parent[node]
+        path.append(grid.pos(node))
+    path.reverse()
+    return path
+
+
+def bfs(grid, start, end, trace=False):
+    start, end = grid.index(start), grid.index(end)
+    blocked = grid.blocked
+    if blocked[start] or blocked[end]:
+        return SearchResult(None, 0)
+    offsets = grid.offsets
+    queue = deque([start])
+    visited = bytearray(grid.size)
+    visited[start] = 1
+    parent = {}
+    expanded = 0
+    pushes = 1
+    max_frontier = 0
+    found = False
+    while queue:
+        if len(queue) > max_frontier:
+            max_frontier = len(queue)
+        current = queue.popleft()
+        expanded += 1
+        if current == end:
+            found = True
+            break
+        for offset in offsets:
+            neighbor = current + offset
+            if not blocked[neighbor] and not visited[neighbor]:
+                parent[neighbor] = current
+                visited[neighbor] = 1
+                queue.append(neighbor)
+                pushes += 1
+                if trace:
+                    yield QUEUE, neighbor
+        if trace:
+            yield VISITED, current
+    if not found:
+        return SearchResult(None, expanded, max_frontier, pushes)
+    return SearchResult(reconstruct_path(grid, parent, start, end), expanded, max_frontier, pushes)
+
+
+def bidirectional_bfs(grid, start, end, trace=False):
+    start, end = grid.index(start), grid.index(end)
+    blocked = grid.blocked
+    if blocked[start] or blocked[end]:
+        return SearchResult(None, 0)
+    offsets = grid.offsets
+    queue_start = deque([start])
+    queue_end = deque([end])
+    parent_start = {start: None}
+    parent_end = {end: None}
+    meeting_node = None
+    expanded = 0
+    pushes = 2
+    max_frontier = 0
+    while queue_start and queue_end:
+        if len(queue_start) + len(queue_end) > max_frontier:
+            max_frontier = len(queue_start) + len(queue_end)
+        current_start = queue_start.popleft()
+        expanded += 1
+        if current_start in parent_end:
+            meeting_node = current_start
+            break
+        for offset in offsets:
+            neighbor = current_start + offset
+            if not blocked[neighbor] and neighbor not in parent_start:
+                parent_start[neighbor] = current_start
+                queue_start.append(neighbor)
+                pushes += 1
+                if trace:
+                    yield QUEUE, neighbor
+        current_end = queue_end.popleft()
+        expanded += 1
+        if current_end in parent_start:
+            meeting_node = current_end
+            break
+        for offset in offsets:
+            neighbor = current_end + offset
+            if not blocked[neighbor] and neighbor not in parent_end:
+                parent_end[neighbor] = current_end
+                queue_end.append(neighbor)
+                pushes += 1
+                if trace:
+                    yield QUEUE_END, neighbor
+        if trace:
+            yield VISITED, current_start
+            yield VISITED_END, current_end
+    if meeting_node is None:
+        return SearchResult(None, expanded, max_frontier, pushes)
+    path_start = []
+    node = meeting_node
+    while node is not None:
+        path_start.append(grid.pos(node))
+        node = parent_start[node]
+    path_start.reverse()
+    path_end = []
+    node = parent_end[meeting_node]
+    while node is not None:
+        path_end.append(grid.pos(node))
+        node = parent_end[node]
+    return SearchResult(path_start + path_end, expanded, max_frontier, pushes)
+
+
+def dfs(grid, start, end, trace=False):
+    start, end = grid.index(start), grid.index(end)
+    blocked = grid.blocked
+    if blocked[start] or blocked[end]:
+        return SearchResult(None, 0)
+    offsets = grid.offsets
+    stack = [start]
+    visited = bytearray(grid.size)
+    visited[start] = 1
+    parent = {}
+    expanded = 0
+    pushes = 1
+    max_frontier = 0
+    found = False
+    while stack:
+        if len(stack) > max_frontier:
+            max_frontier = len(stack)
+        current = stack.pop()
+        expanded += 1
+        if current == end:
+            found = True
+            break
+        for offset in offsets:
+            neighbor = current + offset
+            if not blocked[neighbor] and not visited[neighbor]:
+                parent[neighbor] = current
+                visited[neighbor] = 1
+                stack.append(neighbor)
+                pushes += 1
+                if trace:
+                    yield QUEUE, neighbor
+        if trace:
+            yield VISITED, current
+    if not found:
+        return SearchResult(None, expanded, max_frontier, pushes)
+    return SearchResult(reconstruct_path(grid, parent, start, end), expanded, max_frontier, pushes)
+
+
+def greedy_best_first(grid, start, end, trace=False, bounds=None):
+    width = grid.width
+    end_row, end_col = divmod(grid.index(end), width)
+    start, end = grid.index(start), grid.index(end)
+    blocked = grid.blocked
+    if blocked[start] or blocked[end]:
+        return SearchResult(None, 0)
+    offsets = grid.offsets
+    heap = []
+    counter = itertools.count()
+    heapq.heappush(heap, (0, next(counter), start))
+    parent = {}
+    visited = bytearray(grid.size)
+    visited[start] = 1
+    expanded = 0
+    pushes = 1
+    max_frontier = 0
+    found = False
+    while heap:
+        if len(heap) > max_frontier:
+            max_frontier = len(heap)
+        _, _, current = heapq.heappop(heap)
+        expanded += 1
+        if current == end:
+            found = True
+            break
+        for offset in offsets:
+            neighbor = current + offset
+            if not blocked[neighbor] and not visited[neighbor]:
+                parent[neighbor] = current
+                visited[neighbor] = 1
+                if bounds is None:
+                    row, col = divmod(neighbor, width)
+                    heapq.heappush(heap, (abs(row - end_row) + abs(col - end_col), next(counter), neighbor))
+                else:
+                    heapq.heappush(heap, (bounds[neighbor], next(counter), neighbor))
+                pushes += 1
+                if trace:
+                    yield QUEUE, neighbor
+        if trace:
+            yield VISITED, current
+    if not found:
+        return SearchResult(None, expanded, max_frontier, pushes)
+    return SearchResult(reconstruct_path(grid, parent, start, end), expanded, max_frontier, pushes)
+
+
+def astar(grid, start, end, trace=False, bounds=None):
+    width = grid.width
+    end_row, end_col = divmod(grid.index(end), width)
+    start, end = grid.index(start), grid.index(end)
+    blocked = grid.blocked
+    if blocked[start] or blocked[end]:
+        return SearchResult(None, 0)
+    offsets = grid.offsets
+    pool = grid.buffer_pool
+    buffers = pool.pop() if pool else SearchBuffers(grid.size)
+    try:
+        generation = buffers.next_generation()
+        seen, closed = buffers.seen, buffers.closed
+        g_score, parent = buffers.g, buffers.parent
+        heap = buffers.heap
+        cells, pop, push, decrease = heap.cells, heap.pop, heap.push, heap.decrease
+        seen[start] = generation
+        g_score[start] = 0
+        push(start, 0)
+        expanded = 0
+        pushes = 1
+        max_frontier = 0
+        found = False
+        while cells:
+            if len(cells) > max_frontier:
+                max_frontier = len(cells)
+            current = pop()
+            closed[current] = generation
+            expanded += 1
+            if current == end:
+                found = True
+                break
+            tentative_g = g_score[current] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if blocked[neighbor] or closed[neighbor] == generation:
+                    continue
+                known = seen[neighbor] == generation
+                if known and tentative_g >= g_score[neighbor]:
+                    continue
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                if bounds is None:
+                    row, col = divmod(neighbor, width)
+                    h = abs(row - end_row) + abs(col - end_col)
+                else:
+                    h = bounds[neighbor]
+                key = (tentative_g + h) << 32 | h
+                if known:
+                    decrease(neighbor, key)
+                else:
+                    seen[neighbor] = generation
+                    push(neighbor, key)
+                pushes += 1
+                if trace:
+                    yield QUEUE, neighbor
+            if trace:
+                yield VISITED, current
+        if not found:
+            return SearchResult(None, expanded, max_frontier, pushes)
+        return SearchResult(unwind_path(grid, parent, start, end), expanded, max_frontier, pushes)
+    finally:
+        pool.append(buffers)
+
+
+def heap_search(grid, start, end, trace=False, informed=True):
+    width = grid.width
+    end_row, end_col = divmod(grid.index(end), width)
+    start, end = grid.index(start), grid.index(end)
+    blocked = grid.blocked
+    if blocked[start] or blocked[end]:
+        return SearchResult(None, 0)
+    costs = grid.costs
+    offsets = grid.offsets
+    scale = grid.min_cost if informed else 0
+    heap = [(0, 0, start)]
+    counter = itertools.count(1)
+    g_score = {start: 0}
+    parent = {}
+    closed = bytearray(grid.size)
+    expanded = 0
+    pushes = 1
+    stale = 0
+    max_frontier = 0
+    found = False
+    while heap:
+        if len(heap) > max_frontier:
+            max_frontier = len(heap)
+        _, _, current = heapq.heappop(heap)
+        if closed[current]:
+            stale += 1
+            continue
+        closed[current] = 1
+        expanded += 1
+        if current == end:
+            found = True
+            break
+        g = g_score[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if blocked[neighbor] or closed[neighbor]:
+                continue
+            tentative_g = g + costs[neighbor]
+            if tentative_g < g_score.get(neighbor, tentative_g + 1):
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                f_score = tentative_g
+                if scale:
+                    row, col = divmod(neighbor, width)
+                    f_score += scale * (abs(row - end_row) + abs(col - end_col))
+                heapq.heappush(heap, (f_score, next(counter), neighbor))
+                pushes += 1
+                if trace:
+                    yield QUEUE, neighbor
+        if trace:
+            yield VISITED, current
+    if not found:
+        return SearchResult(None, expanded, max_frontier, pushes, stale)
+    return SearchResult(reconstruct_path(grid, parent, start, end), expanded, max_frontier, pushes, stale, g_score[end])
+
+
+def bucket_search(grid, start, end, trace=False, informed=True):
+    width = grid.width
+    end_row, end_col = divmod(grid.index(end), width)
+    start, end = grid.index(start), grid.index(end)
+    blocked = grid.blocked
+    if blocked[start] or blocked[end]:
+        return SearchResult(None, 0)
+    costs = grid.costs
+    offsets = grid.offsets
+    scale = grid.min_cost if informed else 0
+    span = grid.max_cost + scale + 1
+    buckets = [[] for _ in range(span)]
+    row, col = divmod(start, width)
+    key = scale * (abs(row - end_row) + abs(col - end_col))
+    buckets[key % span].append(start)
+    g_score = {start: 0}
+    parent = {}
+    closed = bytearray(grid.size)
+    pending = 1
+    expanded = 0
+    pushes = 1
+    stale = 0
+    max_frontier = 1
+    found = False
+    while pending:
+        bucket = buckets[key % span]
+        if not bucket:
+            key += 1
+            continue
+        current = bucket.pop()
+        pending -= 1
+        if closed[current]:
+            stale += 1
+            continue
+        closed[current] = 1
+        expanded += 1
+        if current == end:
+            found = True
+            break
+        g = g_score[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if blocked[neighbor] or closed[neighbor]:
+                continue
+            tentative_g = g + costs[neighbor]
+            if tentative_g < g_score.get(neighbor, tentative_g + 1):
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                f_score = tentative_g
+                if scale:
+                    row, col = divmod(neighbor, width)
+                    f_score += scale * (abs(row - end_row) + abs(col - end_col))
+                buckets[f_score % span].append(neighbor)
+                pending += 1
+                pushes += 1
+                if trace:
+                    yield QUEUE, neighbor
+        if pending > max_frontier:
+            max_frontier = pending
+        if trace:
+            yield VISITED, current
+    if not found:
+        return SearchResult(None, expanded, max_frontier, pushes, stale)
+    return SearchResult(reconstruct_path(grid, parent, start, end), expanded, max_frontier, pushes, stale, g_score[end])
+
+
+def dijkstra(grid, start, end, trace=False):
+    return heap_search(grid, start, end, trace, informed=False)
+
+
+def terrain_astar(grid, start, end, trace=False):
+    return heap_search(grid, start, end, trace)
+
+
+def dial(grid, start, end, trace=False):
+    return bucket_search(grid, start, end, trace, informed=False)
+
+
+def dial_astar(grid, start, end, trace=False):
+    return bucket_search(grid, start, end, trace)
+
+
+def jump(blocked, width, node, step, end):
+    horizontal = step == 1 or step == -1
+    while True:
+        node += step
+        if blocked[node]:
+            return None
+        if node == end:
+            return node
+        if horizontal:
+            if (not blocked[node + width] and blocked[node - step + width]) or \
+                    (not blocked[node - width] and blocked[node - step - width]):
+                return node
+        else:
+            if (not blocked[node + 1] and blocked[node - step + 1]) or \
+                    (not blocked[node - 1] and blocked[node - step - 1]):
+                return node
+            if jump(blocked, width, node, 1, end) is not None or jump(blocked, width, node, -1, end) is not None:
+                return node
+
+
+def jump_directions(width, node, parent):
+    if parent is None:
+        return (1, width, -1, -width)
+    delta = node - parent
+    if -width < delta < width:
+        step = 1 if delta > 0 else -1
+        return (width, -width, step)
+    step = width if delta > 0 else -width
+    return (1, -1, step)
+
+
+def jump_point_search(grid, start, end, trace=False):
+    width = grid.width
+    end_row, end_col = divmod(grid.index(end), width)
+    start, end = grid.index(start), grid.index(end)
+    blocked = grid.blocked
+    if blocked[start] or blocked[end]:
+        return SearchResult(None, 0)
+    heap = []
+    counter = itertools.count()
+    g_score = {start: 0}
+    heapq.heappush(heap, (0, 0, next(counter), start))
+    parent = {start: None}
+    closed = set()
+    expanded = 0
+    pushes = 1
+    stale = 0
+    max_frontier = 0
+    found = False
+    while heap:
+        if len(heap) > max_frontier:
+            max_frontier = len(heap)
+        _, _, _, current = heapq.heappop(heap)
+        if current in closed:
+            stale += 1
+            continue
+        closed.add(current)
+        expanded += 1
+        if current == end:
+            found = True
+            break
+        for step in jump_directions(width, current, parent[current]):
+            if blocked[current + step]:
+                continue
+            point = jump(blocked, width, current, step, end)
+            if point is None or point in closed:
+                continue
+            distance = abs(point - current)
+            if step != 1 and step != -1:
+                distance //= width
+            tentative_g = g_score[current] + distance
+            if tentative_g < g_score.get(point, tentative_g + 1):
+                g_score[point] = tentative_g
+                parent[point] = current
+                row, col = divmod(point, width)
+                h = abs(row - end_row) + abs(col - end_col)
+                heapq.heappush(heap, (tentative_g + h, h, next(counter), point))
+                pushes += 1
+                if trace:
+                    yield QUEUE, point
+        if trace:
+            yield VISITED, current
+    if not found:
+        return SearchResult(None, expanded, max_frontier, pushes, stale)
+    points = [end]
+    while parent[points[-1]] is not None:
+        points.append(parent[points[-1]])
+    points.reverse()
+    path = [grid.pos(start)]
+    for a, b in zip(points, points[1:]):
+        step = 1 if -width < b - a < width else width
+        if b < a:
+            step = -step
+        for node in range(a + step, b + step, step):
+            path.append(grid.pos(node))
+    return SearchResult(path, expanded, max_frontier, pushes, stale)
+
+
+def wavefronts(grid, source, targets=None):
+    distances = np.where(grid.walls != 0, WALL, UNREACHABLE).astype(np.int32)
+    offsets = np.array(grid.offsets, dtype=np.intp)
+    slots = np.empty(grid.size, dtype=np.intp)
+    frontier = np.array([grid.index(source)], dtype=np.intp)
+    if distances[frontier[0]] == WALL:
+        return distances
+    distances[frontier] = 0
+    depth = 0
+    while frontier.size:
+        yield depth, frontier
+        if targets is not None and np.all(distances[targets] >= 0):
+            break
+        depth += 1
+        candidates = (frontier[:, None] + offsets).ravel()
+        candidates = candidates[distances[candidates] == UNREACHABLE]
+        order = np.arange(candidates.size)
+        slots[candidates] = order
+        frontier = candidates[slots[candidates] == order]
+        distances[frontier] = depth
+    return distances
+
+
+def distance_field(grid, source):
+    return DistanceField(grid, source, run(wavefronts(grid, source)))
+
+
+def distances_to(grid, source, targets):
+    targets = np.array([grid.index(target) for target in targets], dtype=np.intp)
+    distances = run(wavefronts(grid, source, targets))[targets]
+    return [int(distance) if distance >= 0 else None for distance in distances]
+
+
+def wavefront_bfs(grid, start, end, trace=False):
+    target = grid.index(end)
+    waves = wavefronts(grid, start, target)
+    expanded = 0
+    max_frontier = 0
+    previous = None
+    while True:
+        try:
+            _, frontier = next(waves)
+        except StopIteration as stop:
+            distances = stop.value
+            break
+        expanded += frontier.size
+        max_frontier = max(max_frontier, frontier.size)
+        if trace:
+            if previous is not None:
+                for index in previous.tolist():
+                    yield VISITED, index
+            for index in frontier.tolist():
+                yield QUEUE, index
+            previous = frontier
+    return SearchResult(DistanceField(grid, start, distances).path_to(end), expanded, max_frontier, expanded)
+
+
+def landmark_astar(grid, start, end, trace=False):
+    return (yield from astar(grid, start, end, trace, grid.landmarks().bounds(end)))
+
+
+def landmark_greedy(grid, start, end, trace=False):
+    return (yield from greedy_best_first(grid, start, end, trace, grid.landmarks().bounds(end)))
+
+
+ALGORITHMS = {
+    "bfs": bfs,
+    "bidirectional": bidirectional_bfs,
+    "dfs": dfs,
+    "greedy": greedy_best_first,
+    "astar": astar,
+    "alt": landmark_astar,
+    "greedy-alt": landmark_greedy,
+    "jps": jump_point_search,
+    "dijkstra": dijkstra,
+    "terrain-astar": terrain_astar,
+    "dial": dial,
+    "dial-astar": dial_astar,
+    "wavefront": wavefront_bfs,
+}
+WEIGHTED = {"dijkstra", "terrain-astar", "dial", "dial-astar"}
+
+
+def run(steps):
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def search(grid, start, end, algorithm="astar"):
+    began = time.perf_counter()
+    result = run(ALGORITHMS[algorithm](grid, start, end))
+    result.elapsed = time.perf_counter() - began
+    return result
+
+
+def search_steps(grid, start, end, algorithm="astar"):
+    return ALGORITHMS[algorithm](grid, start, end, trace=True)
+
+
+def solve_route(grid, points, algorithm="astar"):
+    results = []
+    for i in range(len(points) - 1):
+        result = search(grid, points[i], points[i + 1], algorithm)
+        results.append(result)
+        if not result.found:
+            break
+    return results
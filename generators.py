@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+
+import cellgrid
+
+TERRAIN_PATCH = 8
+
+
+def numpy_rng():
+    return np.random.default_rng(random.getrandbits(64))
+
+
+def protected_mask(rows, cols, protected):
+    mask = np.zeros((rows, cols), dtype=bool)
+    for pos in protected:
+        mask[pos] = True
+    return mask
+
+
+def random_obstacle_mask(rows, cols, protected=(), density=0.25):
+    return (numpy_rng().random((rows, cols)) < density) & ~protected_mask(rows, cols, protected)
+
+
+def generate_random_obstacles(grid, start, stops, end, density=0.25):
+    grid.fill(random_obstacle_mask(grid.rows, grid.cols, [start] + stops + [end], density), cellgrid.OBSTACLE)
+
+
+def random_terrain_weights(rows, cols, max_weight=cellgrid.MAX_WEIGHT, patch=TERRAIN_PATCH):
+    coarse = numpy_rng().integers(1, max_weight + 1, (-(-rows // patch), -(-cols // patch)), dtype=np.uint8)
+    return np.repeat(np.repeat(coarse, patch, axis=0), patch, axis=1)[:rows, :cols]
+
+
+def generate_random_terrain(grid, max_weight=cellgrid.MAX_WEIGHT):
+    grid.fill_weights(random_terrain_weights(grid.rows, grid.cols, max_weight))
+
+
+def division_walls(rows, cols, protected=()):
+    rng = numpy_rng()
+    skip = protected_mask(rows, cols, protected)
+    border = np.zeros((rows, cols), dtype=bool)
+    border[[0, -1], :] = True
+    border[:, [0, -1]] = True
+    order = [np.flatnonzero(border & ~skip)]
+    skip |= border
+    skip = skip.ravel()
+    x = np.zeros(1, dtype=np.int64)
+    y = np.zeros(1, dtype=np.int64)
+    w = np.array([cols], dtype=np.int64)
+    h = np.array([rows], dtype=np.int64)
+    horizontal = np.array([rows > cols])
+    while len(x):
+        keep = (w >= 3) & (h >= 3)
+        x, y, w, h, horizontal = x[keep], y[keep], w[keep], h[keep], horizontal[keep]
+        if not len(x):
+            break
+        along = np.where(horizontal, w, h)
+        across = np.where(horizontal, h, w)
+        split = np.where(horizontal, y, x) + 1 + 2 * rng.integers(0, (across - 1) // 2)
+        gap = np.where(horizontal, x, y) + 2 * rng.integers(0, (along + 1) // 2)
+        first = np.where(horizontal, split * cols + x, y * cols + split)
+        step = np.where(horizontal, 1, cols)
+        gap = np.where(horizontal, split * cols + gap, gap * cols + split)
+        offsets = np.arange(along.sum()) - np.repeat(np.cumsum(along) - along, along)
+        walls = np.repeat(first, along) + np.repeat(step, along) * offsets
+        walls = walls[(walls != np.repeat(gap, along)) & ~skip[walls]]
+        order.append(walls)
+        x, y, w, h = (
+            np.concatenate((x, np.where(horizontal, x, split + 1))),
+            np.concatenate((y, np.where(horizontal, split + 1, y))),
+            np.concatenate((np.where(horizontal, w, split - x), np.where(horizontal, w, x + w - split - 1))),
+            np.concatenate((np.where(horizontal, split - y, h), np.where(horizontal, y + h - split - 1, h))),
+        )
+        horizontal = np.concatenate((~horizontal, ~horizontal))
+    return np.concatenate(order)
+
+
+def recursive_division_maze(grid, start, stops, end):
+    walls = division_walls(grid.rows, grid.cols, [start] + stops + [end])
+    mask = np.zeros(grid.rows * grid.cols, dtype=bool)
+    mask[walls] = True
+    grid.clear()
+    grid.fill(mask.reshape(grid.rows, grid.cols), cellgrid.OBSTACLE)
+    return walls
+
+
+def wall_steps(walls, cols):
+    for index in walls.tolist():
+        yield cellgrid.OBSTACLE, divmod(index, cols)
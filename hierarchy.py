@@ -0,0 +1,281 @@
+import heapq
+import itertools
+
+import numpy as np
+
+from engine import QUEUE, VISITED, SearchResult, reconstruct_path, run
+
+CLUSTER_SIZE = 32
+MAX_CLUSTER_SIZE = 64
+WIDE_ENTRANCE = 6
+ONE = np.uint64(1)
+
+
+def runs(mask):
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist())
+
+
+class HierarchicalGrid:
+    def __init__(self, grid, cluster=CLUSTER_SIZE):
+        if not 1 <= cluster <= MAX_CLUSTER_SIZE:
+            raise ValueError("cluster size must be between 1 and %d" % MAX_CLUSTER_SIZE)
+        self.grid = grid
+        self.cluster = cluster
+        self.width = grid.width
+        self.walls = grid.walls.reshape(grid.rows + 2, grid.width).copy()
+        self.blocked = bytearray(grid.blocked)
+        self.clusters = (-(-grid.rows // cluster), -(-grid.cols // cluster))
+        self.transitions = {}
+        self.inter = {}
+        self.nodes = {}
+        self.intra = {}
+        for cx in range(self.clusters[0]):
+            for cy in range(self.clusters[1]):
+                if cx + 1 < self.clusters[0]:
+                    self.scan_border((cx, cy), (cx + 1, cy))
+                if cy + 1 < self.clusters[1]:
+                    self.scan_border((cx, cy), (cx, cy + 1))
+
+    def cluster_of(self, node):
+        row, col = divmod(node, self.width)
+        return ((row - 1) // self.cluster, (col - 1) // self.cluster)
+
+    def bounds(self, cid):
+        r0 = cid[0] * self.cluster + 1
+        c0 = cid[1] * self.cluster + 1
+        return r0, min(r0 + self.cluster, self.grid.rows + 1), c0, min(c0 + self.cluster, self.grid.cols + 1)
+
+    def link(self, u, v):
+        self.inter.setdefault(u, set()).add(v)
+        self.inter.setdefault(v, set()).add(u)
+        self.nodes.setdefault(self.cluster_of(u), set()).add(u)
+        self.nodes.setdefault(self.cluster_of(v), set()).add(v)
+
+    def unlink(self, u, v):
+        for a, b in ((u, v), (v, u)):
+            neighbors = self.inter[a]
+            neighbors.discard(b)
+            if not neighbors:
+                del self.inter[a]
+                self.nodes[self.cluster_of(a)].discard(a)
+
+    def scan_border(self, a, b):
+        for u, v in self.transitions.pop((a, b), ()):
+            self.unlink(u, v)
+        self.intra.pop(a, None)
+        self.intra.pop(b, None)
+        r0, r1, c0, c1 = self.bounds(a)
+        walls = self.walls
+        if b[0] != a[0]:
+            passable = (walls[r1 - 1, c0:c1] == 0) & (walls[r1, c0:c1] == 0)
+            first, step, across = (r1 - 1) * self.width + c0, 1, self.width
+        else:
+            passable = (walls[r0:r1, c1 - 1] == 0) & (walls[r0:r1, c1] == 0)
+            first, step, across = r0 * self.width + c1 - 1, self.width, 1
+        pairs = []
+        for start, stop in runs(passable):
+            picks = (start, stop - 1) if stop - start >= WIDE_ENTRANCE else ((start + stop - 1) // 2,)
+            for i in picks:
+                u = first + i * step
+                self.link(u, u + across)
+                pairs.append((u, u + across))
+        self.transitions[(a, b)] = pairs
+
+    def local_distances(self, cid, sources, targets):
+        r0, r1, c0, c1 = self.bounds(cid)
+        free = (self.walls[r0:r1, c0:c1] == 0).astype(np.uint64)
+        free = (free << np.arange(c1 - c0, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+        rows, cols = np.divmod(np.array(sources, dtype=np.intp), self.width)
+        frontier = np.zeros((len(sources), r1 - r0), dtype=np.uint64)
+        frontier[np.arange(len(sources)), rows - r0] = ONE << (cols - c0).astype(np.uint64)
+        reached = frontier.copy()
+        rows, cols = np.divmod(np.array(targets, dtype=np.intp), self.width)
+        rows -= r0
+        bits = (cols - c0).astype(np.uint64)
+        distances = np.where((reached[:, rows] >> bits) & ONE, 0, -1)
+        depth = 0
+        while frontier.any():
+            depth += 1
+            grown = frontier | (frontier << ONE) | (frontier >> ONE)
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :-1] |= frontier[:, 1:]
+            frontier = grown & free & ~reached
+            reached |= frontier
+            distances[((frontier[:, rows] >> bits) & ONE).astype(bool)] = depth
+        return distances
+
+    def edges(self, cid):
+        edges = self.intra.get(cid)
+        if edges is None:
+            nodes = list(self.nodes.get(cid, ()))
+            edges = {}
+            if nodes:
+                table = self.local_distances(cid, nodes, nodes).tolist()
+                for u, row in zip(nodes, table):
+                    edges[u] = {v: d for v, d in zip(nodes, row) if d > 0}
+            self.intra[cid] = edges
+        return edges
+
+    def precompute(self):
+        for cx in range(self.clusters[0]):
+            for cy in range(self.clusters[1]):
+                self.edges((cx, cy))
+
+    def update(self, changes):
+        cluster = self.cluster
+        dirty = set()
+        borders = set()
+        for pos, blocked in changes:
+            node = self.grid.index(pos)
+            if self.blocked[node] == bool(blocked):
+                continue
+            self.blocked[node] = bool(blocked)
+            self.walls[pos[0] + 1, pos[1] + 1] = bool(blocked)
+            cx, cy = pos[0] // cluster, pos[1] // cluster
+            dirty.add((cx, cy))
+            if pos[0] % cluster == 0 and cx > 0:
+                borders.add(((cx - 1, cy), (cx, cy)))
+            if pos[0] % cluster == cluster - 1 and cx + 1 < self.clusters[0]:
+                borders.add(((cx, cy), (cx + 1, cy)))
+            if pos[1] % cluster == 0 and cy > 0:
+                borders.add(((cx, cy - 1), (cx, cy)))
+            if pos[1] % cluster == cluster - 1 and cy + 1 < self.clusters[1]:
+                borders.add(((cx, cy), (cx, cy + 1)))
+        for cid in dirty:
+            self.intra.pop(cid, None)
+        for a, b in borders:
+            self.scan_border(a, b)
+        return len(dirty)
+
+    def local_path(self, bounds, source, target):
+        r0, r1, c0, c1 = bounds
+        width = self.width
+        blocked = self.blocked
+        end_row, end_col = divmod(target, width)
+        heap = [(0, 0, 0, source)]
+        counter = itertools.count(1)
+        g_score = {source: 0}
+        parent = {}
+        closed = set()
+        while heap:
+            _, _, _, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            if current == target:
+                break
+            tentative_g = g_score[current] + 1
+            for offset in self.grid.offsets:
+                neighbor = current + offset
+                if blocked[neighbor]:
+                    continue
+                row, col = divmod(neighbor, width)
+                if not (r0 <= row < r1 and c0 <= col < c1):
+                    continue
+                if tentative_g < g_score.get(neighbor, tentative_g + 1):
+                    g_score[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    h = abs(row - end_row) + abs(col - end_col)
+                    heapq.heappush(heap, (tentative_g + h, h, next(counter), neighbor))
+        return reconstruct_path(self.grid, parent, source, target), len(closed)
+
+    def nearby_path(self, start, goal):
+        a, b = self.cluster_of(start), self.cluster_of(goal)
+        if abs(a[0] - b[0]) > 1 or abs(a[1] - b[1]) > 1:
+            return None
+        ra, rb = self.bounds(a), self.bounds(b)
+        bounds = (min(ra[0], rb[0]), max(ra[1], rb[1]), min(ra[2], rb[2]), max(ra[3], rb[3]))
+        return self.local_path(bounds, start, goal)
+
+    def steps(self, start, goal, trace=False):
+        grid = self.grid
+        width = self.width
+        start, goal = grid.index(start), grid.index(goal)
+        if self.blocked[start] or self.blocked[goal]:
+            return SearchResult(None, 0)
+        nearby = self.nearby_path(start, goal)
+        if nearby is not None and nearby[0] is not None:
+            path, expanded = nearby
+            return SearchResult(path, expanded)
+        start_cluster, goal_cluster = self.cluster_of(start), self.cluster_of(goal)
+        goal_nodes = list(self.nodes.get(goal_cluster, ()))
+        to_goal = {}
+        if goal_nodes:
+            row = self.local_distances(goal_cluster, [goal], goal_nodes)[0].tolist()
+            to_goal = {u: d for u, d in zip(goal_nodes, row) if d >= 0}
+        targets = list(self.nodes.get(start_cluster, ()))
+        if start_cluster == goal_cluster:
+            targets.append(goal)
+        from_start = {}
+        if targets:
+            row = self.local_distances(start_cluster, [start], targets)[0].tolist()
+            from_start = {u: d for u, d in zip(targets, row) if d >= 0}
+
+        end_row, end_col = divmod(goal, width)
+        heap = [(0, 0, 0, start)]
+        counter = itertools.count(1)
+        g_score = {start: 0}
+        parent = {start: None}
+        closed = set()
+        expanded = 0
+        pushes = 1
+        stale = 0
+        max_frontier = 0
+        found = False
+        while heap:
+            if len(heap) > max_frontier:
+                max_frontier = len(heap)
+            _, _, _, current = heapq.heappop(heap)
+            if current in closed:
+                stale += 1
+                continue
+            closed.add(current)
+            expanded += 1
+            if current == goal:
+                found = True
+                break
+            if current == start:
+                neighbors = list(from_start.items())
+            else:
+                neighbors = list(self.edges(self.cluster_of(current)).get(current, {}).items())
+                if current in to_goal:
+                    neighbors.append((goal, to_goal[current]))
+            neighbors += [(neighbor, 1) for neighbor in self.inter.get(current, ())]
+            for neighbor, cost in neighbors:
+                tentative_g = g_score[current] + cost
+                if neighbor in closed or tentative_g >= g_score.get(neighbor, tentative_g + 1):
+                    continue
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                row, col = divmod(neighbor, width)
+                h = abs(row - end_row) + abs(col - end_col)
+                heapq.heappush(heap, (tentative_g + h, h, next(counter), neighbor))
+                pushes += 1
+                if trace:
+                    yield QUEUE, neighbor
+            if trace:
+                yield VISITED, current
+        if not found:
+            return SearchResult(None, expanded, max_frontier, pushes, stale)
+
+        abstract = [goal]
+        while parent[abstract[-1]] is not None:
+            abstract.append(parent[abstract[-1]])
+        abstract.reverse()
+        path = [grid.pos(start)]
+        for u, v in zip(abstract, abstract[1:]):
+            cluster = self.cluster_of(u)
+            if cluster != self.cluster_of(v):
+                path.append(grid.pos(v))
+                continue
+            segment, refined = self.local_path(self.bounds(cluster), u, v)
+            expanded += refined
+            path.extend(segment[1:])
+        return SearchResult(path, expanded, max_frontier, pushes, stale)
+
+    def search(self, start, goal):
+        return run(self.steps(start, goal))
+
+    def search_steps(self, start, goal):
+        return self.steps(start, goal, trace=True)
@@ -0,0 +1,113 @@
+import heapq
+import itertools
+import math
+
+
+class LPAStar:
+    def __init__(self, grid, start, goal, weighted=False):
+        self.grid = grid
+        self.width = grid.width
+        self.offsets = grid.offsets
+        self.blocked = bytearray(grid.blocked)
+        self.costs = grid.costs if weighted else bytes([1]) * grid.size
+        self.scale = grid.min_cost if weighted else 1
+        self.start = grid.index(start)
+        self.goal = grid.index(goal)
+        self.goal_row, self.goal_col = divmod(self.goal, self.width)
+        self.g = {}
+        self.rhs = {self.start: 0}
+        self.heap = []
+        self.open = {}
+        self.counter = itertools.count()
+        self.expanded = 0
+        self.push(self.start)
+        self.compute()
+
+    def heuristic(self, node):
+        row, col = divmod(node, self.width)
+        return self.scale * (abs(row - self.goal_row) + abs(col - self.goal_col))
+
+    def key(self, node):
+        best = min(self.g.get(node, math.inf), self.rhs.get(node, math.inf))
+        return (best + self.heuristic(node), best)
+
+    def push(self, node):
+        key = self.key(node)
+        self.open[node] = key
+        heapq.heappush(self.heap, (key, next(self.counter), node))
+
+    def top_key(self):
+        heap = self.heap
+        while heap and self.open.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else (math.inf, math.inf)
+
+    def update_vertex(self, node):
+        if node != self.start:
+            best = math.inf
+            if not self.blocked[node]:
+                g = self.g
+                cost = self.costs[node]
+                for offset in self.offsets:
+                    neighbor = node + offset
+                    if not self.blocked[neighbor]:
+                        best = min(best, g.get(neighbor, math.inf) + cost)
+            if best == math.inf:
+                self.rhs.pop(node, None)
+            else:
+                self.rhs[node] = best
+        self.open.pop(node, None)
+        if self.g.get(node, math.inf) != self.rhs.get(node, math.inf):
+            self.push(node)
+
+    def compute(self):
+        expanded = 0
+        g, rhs, goal = self.g, self.rhs, self.goal
+        while self.top_key() < self.key(goal) or rhs.get(goal, math.inf) != g.get(goal, math.inf):
+            _, _, node = heapq.heappop(self.heap)
+            del self.open[node]
+            expanded += 1
+            if g.get(node, math.inf) > rhs.get(node, math.inf):
+                g[node] = rhs[node]
+                for offset in self.offsets:
+                    self.update_vertex(node + offset)
+            else:
+                g.pop(node, None)
+                self.update_vertex(node)
+                for offset in self.offsets:
+                    self.update_vertex(node + offset)
+        self.expanded += expanded
+        return expanded
+
+    def update_cells(self, changes):
+        for pos, blocked in changes:
+            node = self.grid.index(pos)
+            if self.blocked[node] == bool(blocked):
+                continue
+            self.blocked[node] = bool(blocked)
+            self.update_vertex(node)
+            for offset in self.offsets:
+                self.update_vertex(node + offset)
+        return self.compute()
+
+    @property
+    def cost(self):
+        cost = self.g.get(self.goal, math.inf)
+        return None if cost == math.inf else cost
+
+    def path(self):
+        if self.cost is None:
+            return None
+        g = self.g
+        node = self.goal
+        path = [self.grid.pos(node)]
+        while node != self.start:
+            target = g[node] - self.costs[node]
+            for offset in self.offsets:
+                neighbor = node + offset
+                if not self.blocked[neighbor] and g.get(neighbor, math.inf) == target:
+                    node = neighbor
+                    break
+            path.append(self.grid.pos(node))
+        path.reverse()
+        return path
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+
+from components import label_components
+
+PASSABLE = b".GS"
+
+
+class Scenario:
+    def __init__(self, bucket, map_name, width, height, start, goal, optimal):
+        self.bucket = bucket
+        self.map_name = map_name
+        self.width = width
+        self.height = height
+        self.start = start
+        self.goal = goal
+        self.optimal = optimal
+
+    def __repr__(self):
+        return "Scenario(%r, %r -> %r, optimal=%r)" % (self.map_name, self.start, self.goal, self.optimal)
+
+
+def read_map(path):
+    with open(path, "rb") as handle:
+        header = {}
+        for line in handle:
+            line = line.strip()
+            if line == b"map":
+                break
+            key, _, value = line.partition(b" ")
+            header[key.decode()] = value.decode()
+        height, width = int(header["height"]), int(header["width"])
+        rows = [line.rstrip(b"\r\n") for line in handle]
+    rows = [row for row in rows if row][:height]
+    if len(rows) != height or any(len(row) != width for row in rows):
+        raise ValueError("%s: expected %dx%d cells" % (path, width, height))
+    cells = np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(height, width)
+    return ~np.isin(cells, np.frombuffer(PASSABLE, dtype=np.uint8)).T
+
+
+def write_map(path, blocked):
+    blocked = np.asarray(blocked, dtype=bool)
+    width, height = blocked.shape
+    cells = np.where(blocked.T, ord("@"), ord(".")).astype(np.uint8)
+    with open(path, "wb") as handle:
+        handle.write(b"type octile\nheight %d\nwidth %d\nmap\n" % (height, width))
+        for row in cells:
+            handle.write(row.tobytes() + b"\n")
+
+
+def read_scenarios(path):
+    scenarios = []
+    with open(path) as handle:
+        for line in handle:
+            fields = line.split()
+            if len(fields) != 9:
+                continue
+            bucket, map_name, width, height, sx, sy, gx, gy = fields[:8]
+            scenarios.append(Scenario(
+                int(bucket), map_name, int(width), int(height),
+                (int(sx), int(sy)), (int(gx), int(gy)), float(fields[8]),
+            ))
+    return scenarios
+
+
+def load_binary(path, shape=None):
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    if shape is None:
+        raise ValueError("%s: raw occupancy grids need an explicit shape" % path)
+    return np.memmap(path, dtype=np.uint8, mode="r", shape=shape)
+
+
+def save_binary(path, blocked):
+    blocked = np.asarray(blocked, dtype=np.uint8)
+    if path.endswith(".npy"):
+        np.save(path, blocked)
+    else:
+        blocked.tofile(path)
+
+
+def load_weights(path, shape=None, max_weight=None):
+    weights = np.array(load_binary(path, shape), dtype=np.uint8)
+    if max_weight is not None and weights.size and weights.max() > max_weight:
+        raise ValueError("%s: terrain costs must be at most %d, found %d" % (path, max_weight, weights.max()))
+    return weights == 0, weights
+
+
+def load_map(path, shape=None):
+    if os.path.splitext(path)[1] == ".map":
+        return read_map(path)
+    return load_binary(path, shape)
+
+
+def endpoints(blocked):
+    labels = label_components(blocked)
+    free = ~blocked.ravel()
+    largest = np.bincount(labels[free]).argmax()
+    rows, cols = np.divmod(np.flatnonzero(free & (labels == largest)), blocked.shape[1])
+    first = np.argmin(rows + cols)
+    last = np.argmax(rows + cols)
+    return (int(rows[first]), int(cols[first])), (int(rows[last]), int(cols[last]))
@@ -0,0 +1,60 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import math
+
+import numpy as np
+
+import engine
+
+_grid = None
+
+
+def _attach(name, shape):
+    global _grid
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        planes = np.ndarray((2,) + shape, dtype=np.uint8, buffer=memory.buf)
+        _grid = engine.OccupancyGrid(planes[0] != 0, planes[1])
+    finally:
+        memory.close()
+
+
+def _solve_leg(task):
+    source, target, algorithm = task
+    return engine.search(_grid, source, target, algorithm)
+
+
+def _distance_row(task):
+    source, points = task
+    return engine.distances_to(_grid, source, points)
+
+
+class RoutePool:
+    def __init__(self, blocked, workers=None, weights=None):
+        blocked = np.asarray(blocked, dtype=bool)
+        self.memory = shared_memory.SharedMemory(create=True, size=max(2 * blocked.size, 1))
+        planes = np.ndarray((2,) + blocked.shape, dtype=np.uint8, buffer=self.memory.buf)
+        planes[0] = blocked
+        planes[1] = 1 if weights is None else weights
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_attach, initargs=(self.memory.name, blocked.shape)
+        )
+
+    def solve_route(self, points, algorithm="astar"):
+        tasks = [(points[i], points[i + 1], algorithm) for i in range(len(points) - 1)]
+        return list(self.executor.map(_solve_leg, tasks))
+
+    def distance_matrix(self, points):
+        rows = self.executor.map(_distance_row, [(source, points) for source in points])
+        return [[math.inf if distance is None else distance for distance in row] for row in rows]
+
+    def close(self):
+        self.executor.shutdown()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,17 +1,27 @@
+import argparse
+import numpy as np
+import os
 import pygame
 import sys
-import random
-from collections import deque
-import heapq
-import itertools
-
-pygame.init()
+import tempfile
+import engine
+import routing
+import incremental
+import maps
+import traces
+from cache import PathCache
+from components import ComponentIndex
+from generators import division_walls, generate_random_obstacles, generate_random_terrain, recursive_division_maze, wall_steps
+from hierarchy import HierarchicalGrid
+import cellgrid
+from cellgrid import CellGrid
+from renderer import GridRenderer, InfoPanel
+from scheduler import AnimationScheduler
 
 WIDTH = 700
 GRID_SIZE = 100
-CELL_SIZE = WIDTH // GRID_SIZE
-WIN = pygame.display.set_mode((WIDTH, WIDTH))
-pygame.display.set_caption("Path Visualizer: Enhanced Maze and Search")
+PANEL_HEIGHT = 110
+TITLE = "Path Visualizer: Enhanced Maze and Search"
 
 BACKGROUND = (255, 255, 255)
 GRID_LINES = (220, 220, 220)
@@ -43,13 +53,48 @@ INPUT_PROMPT = (40, 40, 40)
 INPUT_TEXT = (40, 40, 40)
 OVERLAY = (0, 0, 0, 120)
 
+TERRAIN_LIGHT = (238, 230, 205)
+TERRAIN_DARK = (130, 100, 60)
+TERRAIN_COLORS = [
+    tuple(round(a + (b - a) * (weight - 2) / (cellgrid.MAX_WEIGHT - 2)) for a, b in zip(TERRAIN_LIGHT, TERRAIN_DARK))
+    for weight in cellgrid.TERRAIN_STATES
+]
+
+STATE_COLORS = [BACKGROUND, OBSTACLE, START, STOP, END, PATH] + [
+    palette[kind] for palette in SEARCH_COLORS for kind in cellgrid.SEARCH_KINDS
+] + TERRAIN_COLORS
+
+WIN = None
+RENDERER = None
+PANEL = None
+
 SEARCH_OPTIONS = [
     "Single-Point BFS",
     "Bidirectional BFS",
     "DFS Search",
     "Greedy Best-First",
-    "A* Search"
+    "A* Search",
+    "Jump Point Search",
+    "Hierarchical A*",
+    "Dijkstra (terrain)",
+    "A* (terrain)"
 ]
+SEARCH_ALGORITHMS = ["bfs", "bidirectional", "dfs", "greedy", "astar", "jps", "hpa", "dial", "dial-astar"]
+LANDMARK_VARIANTS = {"astar": "alt", "greedy": "greedy-alt"}
+BASELINES = {"jps": "astar", "hpa": "astar", "alt": "astar", "greedy-alt": "greedy", "dial-astar": "dial"}
+OCCUPANCY = None
+TRACE_PATH = os.path.join(tempfile.gettempdir(), "pathfinder.trace")
+PLAYBACK_RATE = 64
+
+def init_display():
+    global WIN, RENDERER, PANEL
+    if WIN is not None:
+        return
+    pygame.init()
+    WIN = pygame.display.set_mode((WIDTH, WIDTH + PANEL_HEIGHT))
+    pygame.display.set_caption(TITLE)
+    RENDERER = GridRenderer(WIN, (0, 0, WIDTH, WIDTH), STATE_COLORS, GRID_LINES)
+    PANEL = InfoPanel(WIN, (0, WIDTH, WIDTH, PANEL_HEIGHT), pygame.font.SysFont(None, 21), (0, 0, 0), BACKGROUND)
 
 def display_no_path_message(screen, width, height):
     overlay = pygame.Surface((width, height), pygame.SRCALPHA)
@@ -75,315 +120,189 @@ def display_no_path_message(screen, width, height):
             if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
                 waiting = False
 
-class Node:
-    def __init__(self, row, col):
-        self.row = row
-        self.col = col
-        self.x = row * CELL_SIZE
-        self.y = col * CELL_SIZE
-        self.color = BACKGROUND
-        self.previous = None
-
-    def get_pos(self):
-        return (self.row, self.col)
-    
-    def is_obstacle(self):
-        return self.color == OBSTACLE
-    
-    def is_special(self):
-        return self.color in [START, STOP, END]
-    
-    def reset(self):
-        if not self.is_special() and self.color != OBSTACLE:
-            self.color = BACKGROUND
-        self.previous = None
-
-    def draw(self):
-        pygame.draw.rect(WIN, self.color, (self.x, self.y, CELL_SIZE, CELL_SIZE))
-        pygame.draw.rect(WIN, GRID_LINES, (self.x, self.y, CELL_SIZE, CELL_SIZE), 1)
-
-def make_grid():
-    grid = []
-    for i in range(GRID_SIZE):
-        grid.append([])
-        for j in range(GRID_SIZE):
-            grid[i].append(Node(i, j))
+def make_grid(rows=GRID_SIZE, cols=GRID_SIZE, blocked=None, weights=None):
+    grid = CellGrid(rows, cols)
+    if weights is not None:
+        grid.fill_weights(weights)
+    if blocked is not None:
+        grid.fill(blocked, cellgrid.OBSTACLE)
     return grid
 
 def draw_grid(grid):
-    WIN.fill(BACKGROUND, (0, 0, WIDTH, WIDTH))
-    for row in grid:
-        for node in row:
-            node.draw()
-    pygame.display.update()
+    RENDERER.flush(grid)
 
 def get_clicked_pos(pos):
-    x, y = pos
-    if y >= WIDTH:
+    cell = RENDERER.cell_at(pos)
+    if cell is None:
         return None, None
-    row = x // CELL_SIZE
-    col = y // CELL_SIZE
-    return row, col
+    return cell
 
-def get_neighbors(grid, node):
-    neighbors = []
-    row, col = node.get_pos()
-    directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-    for dr, dc in directions:
-        new_row, new_col = row + dr, col + dc
-        if (0 <= new_row < GRID_SIZE and 0 <= new_col < GRID_SIZE):
-            neighbor = grid[new_row][new_col]
-            if not neighbor.is_obstacle():
-                neighbors.append(neighbor)
-    return neighbors
+def occupancy(grid):
+    global OCCUPANCY
+    if OCCUPANCY is None or OCCUPANCY[0] != grid.version:
+        OCCUPANCY = (grid.version, engine.OccupancyGrid(grid.blocked(), grid.weights))
+    return OCCUPANCY[1]
 
-def manhattan(node1, node2):
-    return abs(node1.row - node2.row) + abs(node1.col - node2.col)
+def visualize_search(grid, algorithm, start, end, draw, scheduler, preserve_states=(), search_states=None, hierarchy=None):
+    occupancy_grid = occupancy(grid)
+    def apply(kind, index):
+        pos = occupancy_grid.pos(index)
+        if not grid.is_special(pos) and grid.get(pos) not in preserve_states:
+            grid.set(pos, search_states[kind])
+    if algorithm == "hpa":
+        steps = hierarchy.search_steps(start, end)
+    else:
+        steps = engine.search_steps(occupancy_grid, start, end, algorithm)
+    return scheduler.run(steps, apply, draw)
 
-def bfs_visualize(grid, start, end, draw, preserve_colors=None, search_colors=None):
-    queue = deque()
-    queue.append(start)
-    visited = {start}
-    parent = {}
-    found = False
-    QUEUE = search_colors["QUEUE"]
-    VISITED = search_colors["VISITED"]
-    while queue:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-        current = queue.popleft()
-        if current == end:
-            found = True
-            break
-        for neighbor in get_neighbors(grid, current):
-            if neighbor not in visited:
-                parent[neighbor] = current
-                visited.add(neighbor)
-                queue.append(neighbor)
-                if not neighbor.is_special() and (not preserve_colors or neighbor.color not in preserve_colors):
-                    neighbor.color = QUEUE
-                    draw()
-        if not current.is_special() and (not preserve_colors or current.color not in preserve_colors):
-            current.color = VISITED
-            draw()
-    if not found:
-        return None
-    path = []
-    node = end
-    while node != start:
-        path.append(node)
-        node = parent.get(node)
-        if node is None:
-            return None
-    path.append(start)
-    path.reverse()
-    return path
+def algorithm_name(algorithm):
+    for base, variant in LANDMARK_VARIANTS.items():
+        if algorithm == variant:
+            return algorithm_name(base) + " with landmarks"
+    return SEARCH_OPTIONS[SEARCH_ALGORITHMS.index(algorithm)]
 
-def bidirectional_bfs(grid, start, end, draw, preserve_colors=None, search_colors=None):
-    queue_start = deque([start])
-    queue_end = deque([end])
-    visited_start = {start}
-    visited_end = {end}
-    parent_start = {start: None}
-    parent_end = {end: None}
-    meeting_node = None
-    QUEUE = search_colors["QUEUE"]
-    VISITED = search_colors["VISITED"]
-    QUEUE_END = search_colors["QUEUE_END"]
-    VISITED_END = search_colors["VISITED_END"]
-    while queue_start and queue_end:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-        current_start = queue_start.popleft()
-        if current_start in visited_end:
-            meeting_node = current_start
-            break
-        for neighbor in get_neighbors(grid, current_start):
-            if neighbor not in visited_start:
-                parent_start[neighbor] = current_start
-                visited_start.add(neighbor)
-                queue_start.append(neighbor)
-                if not neighbor.is_special() and (preserve_colors is None or neighbor.color not in preserve_colors):
-                    neighbor.color = QUEUE
-                    draw()
-        current_end = queue_end.popleft()
-        if current_end in visited_start:
-            meeting_node = current_end
-            break
-        for neighbor in get_neighbors(grid, current_end):
-            if neighbor not in visited_end:
-                parent_end[neighbor] = current_end
-                visited_end.add(neighbor)
-                queue_end.append(neighbor)
-                if not neighbor.is_special() and (preserve_colors is None or neighbor.color not in preserve_colors):
-                    neighbor.color = QUEUE_END
-                    draw()
-        if not current_start.is_special() and (preserve_colors is None or current_start.color not in preserve_colors):
-            current_start.color = VISITED
-            draw()
-        if not current_end.is_special() and (preserve_colors is None or current_end.color not in preserve_colors):
-            current_end.color = VISITED_END
-            draw()
-    if not meeting_node:
-        return None
-    path_start = []
-    node = meeting_node
-    while node is not None:
-        path_start.append(node)
-        node = parent_start.get(node)
-    path_start.reverse()
-    path_end = []
-    node = parent_end.get(meeting_node)
-    while node is not None:
-        path_end.append(node)
-        node = parent_end.get(node)
-    return path_start + path_end
+def expansion_report(grid, searched, algorithm, expanded, path_cache):
+    report = "%s: %d expanded" % (algorithm_name(algorithm), expanded)
+    if algorithm in BASELINES and searched:
+        baseline = BASELINES[algorithm]
+        results = [path_cache.search(grid.version, occupancy(grid), s, t, baseline) for s, t in searched]
+        report += " (%s: %d)" % (algorithm_name(baseline), sum(result.expanded for result in results))
+    return report
 
-def dfs_visualize(grid, start, end, draw, preserve_colors=None, search_colors=None):
-    stack = [start]
-    visited = {start}
-    parent = {}
-    found = False
-    QUEUE = search_colors["QUEUE"]
-    VISITED = search_colors["VISITED"]
-    while stack:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-        current = stack.pop()
-        if current == end:
-            found = True
-            break
-        for neighbor in get_neighbors(grid, current):
-            if neighbor not in visited:
-                parent[neighbor] = current
-                visited.add(neighbor)
-                stack.append(neighbor)
-                if not neighbor.is_special() and (not preserve_colors or neighbor.color not in preserve_colors):
-                    neighbor.color = QUEUE
-                    draw()
-        if not current.is_special() and (not preserve_colors or current.color not in preserve_colors):
-            current.color = VISITED
-            draw()
-    if not found:
-        return None
-    path = []
-    node = end
-    while node != start:
-        path.append(node)
-        node = parent.get(node)
-        if node is None:
-            return None
-    path.append(start)
-    path.reverse()
-    return path
+def leg_stats(legs):
+    if not legs:
+        return []
+    searched = [(result, render) for result, render, cached in legs if not cached]
+    lines = ["Route: cost %d, %d expanded, %d pushes, %d stale, compute %.1f ms, render %.1f ms" % (
+        sum(result.cost or 0 for result, _, _ in legs),
+        sum(result.expanded for result, _ in searched),
+        sum(result.pushes for result, _ in searched),
+        sum(result.stale for result, _ in searched),
+        1000 * sum(result.elapsed or 0 for result, _ in searched),
+        1000 * sum(render for _, render, _ in legs),
+    )]
+    for i, (result, render, cached) in enumerate(legs):
+        if cached:
+            lines.append("Leg %d: cost %s (cached), render %.1f ms" % (i + 1, result.cost, 1000 * render))
+            continue
+        lines.append("Leg %d: cost %s, %d exp, %d push, %d stale, frontier %d, %.1f ms compute, %.1f ms render" % (
+            i + 1, result.cost, result.expanded, result.pushes, result.stale, result.max_frontier,
+            1000 * result.elapsed, 1000 * render,
+        ))
+    return lines
 
-def greedy_best_first_search(grid, start, end, draw, preserve_colors=None, search_colors=None):
-    heap = []
-    counter = itertools.count()
-    heapq.heappush(heap, (manhattan(start, end), next(counter), start))
-    parent = {}
-    visited = {start}
-    found = False
-    QUEUE = search_colors["QUEUE"]
-    VISITED = search_colors["VISITED"]
-    while heap:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-        _, _, current = heapq.heappop(heap)
-        if current == end:
-            found = True
-            break
-        for neighbor in get_neighbors(grid, current):
-            if neighbor not in visited:
-                parent[neighbor] = current
-                visited.add(neighbor)
-                heapq.heappush(heap, (manhattan(neighbor, end), next(counter), neighbor))
-                if not neighbor.is_special() and (not preserve_colors or neighbor.color not in preserve_colors):
-                    neighbor.color = QUEUE
-                    draw()
-        if not current.is_special() and (not preserve_colors or current.color not in preserve_colors):
-            current.color = VISITED
-            draw()
-    if not found:
-        return None
-    path = []
-    node = end
-    while node != start:
-        path.append(node)
-        node = parent.get(node)
-        if node is None:
-            return None
-    path.append(start)
-    path.reverse()
-    return path
+def path_steps(path):
+    for pos in path:
+        yield cellgrid.PATH, pos
+
+def build_maze(grid, points, draw, scheduler):
+    if scheduler.speed_name == "Instant":
+        recursive_division_maze(grid, points[0], points[1:-1], points[-1])
+        return
+    walls = division_walls(grid.rows, grid.cols, points)
+    grid.clear()
+    def apply(state, pos):
+        grid.set(pos, state)
+    scheduler.run(wall_steps(walls, grid.cols), apply, draw)
 
-def astar_search(grid, start, end, draw, preserve_colors=None, search_colors=None):
-    heap = []
-    counter = itertools.count()
-    g_score = {start: 0}
-    heapq.heappush(heap, (manhattan(start, end), next(counter), start))
-    parent = {}
-    visited = set()
-    QUEUE = search_colors["QUEUE"]
-    VISITED = search_colors["VISITED"]
-    while heap:
+def record_trace(grid, points, algorithm, path, hierarchy=None):
+    search = None
+    if algorithm == "hpa":
+        search = hierarchy.search_steps
+    recorder = traces.record_route(grid.state, points, algorithm, search, grid.weights)
+    recorder.save(path)
+    return traces.Trace(path)
+
+def play_trace(trace):
+    grid = CellGrid(trace.rows, trace.cols)
+    grid.state[...] = trace.state_at(0)
+    clock = pygame.time.Clock()
+    step = 0
+    rate = PLAYBACK_RATE
+    paused = False
+    panning = False
+    jump = max(1, len(trace) // 20)
+    while True:
+        target = step
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
-        _, _, current = heapq.heappop(heap)
-        if current == end:
-            break
-        visited.add(current)
-        for neighbor in get_neighbors(grid, current):
-            tentative_g = g_score[current] + 1
-            if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                g_score[neighbor] = tentative_g
-                f_score = tentative_g + manhattan(neighbor, end)
-                parent[neighbor] = current
-                heapq.heappush(heap, (f_score, next(counter), neighbor))
-                if not neighbor.is_special() and (not preserve_colors or neighbor.color not in preserve_colors):
-                    neighbor.color = QUEUE
-                    draw()
-        if not current.is_special() and (not preserve_colors or current.color not in preserve_colors):
-            current.color = VISITED
-            draw()
-    path = []
-    node = end
-    while node != start:
-        path.append(node)
-        node = parent.get(node)
-        if node is None:
-            return None
-    path.append(start)
-    path.reverse()
-    return path
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 2:
+                panning = True
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 2:
+                panning = False
+            elif event.type == pygame.MOUSEMOTION and panning:
+                RENDERER.pan(*event.rel)
+            elif event.type == pygame.MOUSEWHEEL:
+                RENDERER.zoom(event.y, pygame.mouse.get_pos())
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return
+                elif event.key == pygame.K_p:
+                    paused = not paused
+                elif event.key == pygame.K_UP:
+                    rate = min(rate * 2, max(len(trace), 1))
+                elif event.key == pygame.K_DOWN:
+                    rate = max(rate // 2, 1)
+                elif event.key == pygame.K_LEFT:
+                    target -= jump
+                elif event.key == pygame.K_RIGHT:
+                    target += jump
+                elif event.key == pygame.K_COMMA:
+                    target -= 1
+                elif event.key == pygame.K_PERIOD:
+                    target += 1
+                elif event.key == pygame.K_HOME:
+                    target = 0
+                elif event.key == pygame.K_END:
+                    target = len(trace)
+        target = min(max(target, 0), len(trace))
+        if target == step + 1:
+            grid.put(*trace.events(step, target))
+            step = target
+        elif target != step:
+            grid.state[...] = trace.state_at(target)
+            grid.repaint = True
+            step = target
+        elif not paused and step < len(trace):
+            target = min(step + rate, len(trace))
+            grid.put(*trace.events(step, target))
+            step = target
+        draw_grid(grid)
+        PANEL.show([
+            "Trace: step %d / %d, leg %d / %d, %d events per frame%s" % (
+                step, len(trace), trace.leg_of(step) + 1, trace.leg_count, rate, " (paused)" if paused else ""),
+            "Up/Down speed, P pause, Left/Right seek 5%, ,/. step, Home/End, Esc back",
+        ])
+        clock.tick(60)
 
-def mark_path(path, draw):
-    for node in path:
-        if not node.is_special() and node.color != PATH:
-            node.color = PATH
-        draw()
+def mark_path(grid, path, draw, scheduler):
+    def apply(state, pos):
+        if not grid.is_special(pos):
+            grid.set(pos, state)
+    scheduler.run(path_steps(path), apply, draw)
 
-def generate_random_obstacles(grid, start, stops, end, density=0.25):
-    for row in grid:
-        for node in row:
-            if node not in [start] + stops + [end] and random.random() < density:
-                node.color = OBSTACLE
+def start_replanning(grid, points, algorithm):
+    occupancy_grid = occupancy(grid)
+    weighted = algorithm in engine.WEIGHTED
+    return [incremental.LPAStar(occupancy_grid, points[i], points[i + 1], weighted) for i in range(len(points) - 1)]
 
-def clear_grid_except_special(grid, start, stops, end):
-    for row in grid:
-        for node in row:
-            if node not in [start] + stops + [end]:
-                node.reset()
+def replan_route(grid, planners, changes):
+    expanded = sum(planner.update_cells(changes) for planner in planners)
+    grid.clear_search()
+    for planner in planners:
+        path = planner.path()
+        if path is None:
+            return expanded, False
+        for pos in path:
+            if not grid.is_special(pos):
+                grid.set(pos, cellgrid.PATH)
+    return expanded, True
+
+def unreachable_waypoints(components, start, stops, end):
+    names = ["stop %d" % (i + 1) for i in range(len(stops))] + ["end"]
+    return [name for name, pos in zip(names, stops + [end]) if not components.connected(start, pos)]
 
 def input_number_modal(screen, prompt):
     font = pygame.font.SysFont(None, 36)
@@ -439,8 +358,8 @@ def vertical_menu(screen, prompt, options):
     prompt_surface = font.render(prompt, True, (40, 40, 40))
     menu_w = WIDTH // 2
     menu_x = WIDTH // 4
-    menu_y = WIDTH // 4
     menu_h = 60 + 60 * len(options)
+    menu_y = (WIDTH - menu_h) // 2
     menu_rect = pygame.Rect(menu_x, menu_y, menu_w, menu_h)
     pygame.draw.rect(screen, (255,255,255), menu_rect, border_radius=16)
     screen.blit(prompt_surface, (menu_x + (menu_w - prompt_surface.get_width()) // 2, menu_y + 20))
@@ -472,87 +391,72 @@ def vertical_menu(screen, prompt, options):
                                         rect.y + (rect.height - label_surface.get_height()) // 2))
         pygame.display.update()
 
-def recursive_division_maze_visual(grid, start, stops, end, draw):
-    for row in grid:
-        for node in row:
-            if node not in [start] + stops + [end]:
-                node.color = BACKGROUND
-    def divide(x, y, w, h, orientation):
-        if w < 3 or h < 3:
-            return
-        horizontal = orientation == 'H'
-        if horizontal:
-            wy = y + random.randrange(1, h - 1, 2)
-            px = x + random.randrange(0, w, 2)
-            for dx in range(w):
-                node = grid[wy][x + dx]
-                if (x + dx, wy) != (px, wy) and node not in [start] + stops + [end]:
-                    node.color = OBSTACLE
-                    draw()
-            divide(x, y, w, wy - y, 'V')
-            divide(x, wy + 1, w, y + h - wy - 1, 'V')
-        else:
-            wx = x + random.randrange(1, w - 1, 2)
-            py = y + random.randrange(0, h, 2)
-            for dy in range(h):
-                node = grid[y + dy][wx]
-                if (wx, y + dy) != (wx, py) and node not in [start] + stops + [end]:
-                    node.color = OBSTACLE
-                    draw()
-            divide(x, y, wx - x, h, 'H')
-            divide(wx + 1, y, x + w - wx - 1, h, 'H')
-    for i in range(GRID_SIZE):
-        for j in [0, GRID_SIZE-1]:
-            if grid[i][j] not in [start] + stops + [end]:
-                grid[i][j].color = OBSTACLE
-                draw()
-            if grid[j][i] not in [start] + stops + [end]:
-                grid[j][i].color = OBSTACLE
-                draw()
-    divide(0, 0, GRID_SIZE, GRID_SIZE, 'H' if GRID_SIZE > GRID_SIZE else 'V')
-
-def draw_instructions(screen, ready_for_obstacles, show=True):
-    if not show:
-        return
-    font = pygame.font.SysFont(None, 28)
-    if ready_for_obstacles:
-        instr1 = font.render("Press R to add random obstacles", True, (0, 0, 0))
-        instr2 = font.render("Press M to add a maze", True, (0, 0, 0))
-        screen.blit(instr1, (20, WIDTH + 5))
-        screen.blit(instr2, (20, WIDTH + 30))
+def draw_instructions(ready_for_obstacles, show=True, stats=()):
+    lines = []
+    if show and ready_for_obstacles:
+        lines += ["Press R to add random obstacles", "Press M to add a maze",
+                  "While animating: P pauses, Right steps when paused, Esc cancels",
+                  "Press T to record the route as a trace and scrub through it",
+                  "Keys 2-9 paint terrain cost, 1 clears it, 0 draws walls, W adds random terrain"]
+    PANEL.show(lines + list(stats))
 
-def main():
-    grid = make_grid()
+def main(rows=GRID_SIZE, cols=GRID_SIZE, blocked=None, trace_path=TRACE_PATH, num_stops=None, weights=None):
+    init_display()
+    if blocked is not None:
+        blocked = np.asarray(blocked, dtype=bool)
+        rows, cols = blocked.shape
+    grid = make_grid(rows, cols, blocked, weights)
     start = None
     stops = []
-    num_stops = 0
     end = None
     running = True
     clock = pygame.time.Clock()
+    scheduler = AnimationScheduler(TITLE)
+    scheduler.show_speed()
     drawing_obstacle = False
     erasing_obstacle = False
+    painting_terrain = False
+    brush = None
+    panning = False
     placing_stops = False
     placing_end = False
     show_instructions = True
+    optimize_order = False
+    landmark_mode = False
+    path_cache = PathCache()
+    incremental_mode = False
+    route_points = None
+    route_algorithm = None
+    planners = None
+    components = None
+    hierarchy = None
+    checked_version = None
+    legs = []
     draw_grid(grid)
-    num_stops = input_number_modal(WIN, "How many stops?")
+    if num_stops is None:
+        num_stops = input_number_modal(WIN, "How many stops?")
+        RENDERER.invalidate()
     while running:
         draw_grid(grid)
         ready_for_obstacles = (start is not None and len(stops) == num_stops and end is not None)
-        draw_instructions(WIN, ready_for_obstacles, show=show_instructions)
-        pygame.display.update()
+        draw_instructions(ready_for_obstacles, show=show_instructions, stats=leg_stats(legs))
+        changes = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 2:
+                panning = True
+            elif event.type == pygame.MOUSEBUTTONDOWN:
                 row, col = get_clicked_pos(event.pos)
                 if row is None or col is None:
                     continue
-                node = grid[row][col]
+                node = (row, col)
                 if event.button == 1:  # Left click
+                    if grid.is_obstacle(node) and (not start or placing_stops or placing_end):
+                        changes.append((node, False))
                     if not start:
                         start = node
-                        node.color = START
+                        grid.set(node, cellgrid.START)
                         if num_stops == 0:
                             placing_stops = False
                             placing_end = True
@@ -560,65 +464,154 @@ def main():
                             placing_stops = True
                     elif placing_stops and len(stops) < num_stops and node not in [start] + stops:
                         stops.append(node)
-                        node.color = STOP
+                        grid.set(node, cellgrid.STOP)
                         if len(stops) == num_stops:
                             placing_stops = False
                             placing_end = True
                     elif placing_end and not end and node not in [start] + stops:
                         end = node
-                        node.color = END
+                        grid.set(node, cellgrid.END)
                         placing_end = False
+                    elif node not in [start] + stops + [end] and brush is not None:
+                        grid.set_weight(node, brush)
+                        painting_terrain = True
+                        route_points = planners = None
                     elif node not in [start] + stops + [end]:
-                        node.color = OBSTACLE
+                        grid.set(node, cellgrid.OBSTACLE)
+                        changes.append((node, True))
                         drawing_obstacle = True
                 elif event.button == 3:  # Right click
-                    if node.color == OBSTACLE:
-                        node.color = BACKGROUND
+                    if grid.is_obstacle(node):
+                        grid.set(node, cellgrid.FREE)
+                        changes.append((node, False))
                         erasing_obstacle = True
             if event.type == pygame.MOUSEBUTTONUP:
                 if event.button == 1:
                     drawing_obstacle = False
+                    painting_terrain = False
+                elif event.button == 2:
+                    panning = False
                 elif event.button == 3:
                     erasing_obstacle = False
-            if event.type == pygame.MOUSEMOTION:
+            if event.type == pygame.MOUSEWHEEL:
+                RENDERER.zoom(event.y, pygame.mouse.get_pos())
+            if event.type == pygame.MOUSEMOTION and panning:
+                RENDERER.pan(*event.rel)
+            elif event.type == pygame.MOUSEMOTION:
                 row, col = get_clicked_pos(event.pos)
                 if row is not None and col is not None:
-                    node = grid[row][col]
+                    node = (row, col)
                     if drawing_obstacle and node not in [start] + stops + [end]:
-                        node.color = OBSTACLE
-                    elif erasing_obstacle and node.color == OBSTACLE:
-                        node.color = BACKGROUND
+                        grid.set(node, cellgrid.OBSTACLE)
+                        changes.append((node, True))
+                    elif painting_terrain and node not in [start] + stops + [end]:
+                        grid.set_weight(node, brush)
+                    elif erasing_obstacle and grid.is_obstacle(node):
+                        grid.set(node, cellgrid.FREE)
+                        changes.append((node, False))
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and start is not None and len(stops) == num_stops and end:
+                if event.key in (pygame.K_UP, pygame.K_DOWN):
+                    scheduler.handle_event(event)
+                elif event.key == pygame.K_SPACE and start is not None and len(stops) == num_stops and end:
                     show_instructions = False
                     mode = vertical_menu(WIN, "Select Search Algorithm", SEARCH_OPTIONS)
+                    RENDERER.invalidate()
                     draw_grid(grid)
-                    pygame.display.update()
-                    for row in grid:
-                        for node in row:
-                            if not node.is_special() and node.color != OBSTACLE:
-                                node.color = BACKGROUND
+                    grid.clear_search()
                     points = [start] + stops + [end]
+                    if not 1 <= mode <= len(SEARCH_ALGORITHMS):
+                        continue
+                    algorithm = SEARCH_ALGORITHMS[mode - 1]
+                    if landmark_mode:
+                        algorithm = LANDMARK_VARIANTS.get(algorithm, algorithm)
+                    order_note = ""
+                    if optimize_order and len(stops) > 1:
+                        ordered, length = routing.order_stops(occupancy(grid), start, stops, end)
+                        if ordered is not None:
+                            points = [start] + ordered + [end]
+                            order_note = " - optimized order, length %d" % length
+                    expanded = 0
+                    legs = []
+                    searched = []
+                    if components is None:
+                        components = ComponentIndex(grid.blocked())
+                    if algorithm == "hpa" and hierarchy is None:
+                        hierarchy = HierarchicalGrid(occupancy(grid))
                     for i in range(len(points) - 1):
                         s, t = points[i], points[i + 1]
-                        search_colors = SEARCH_COLORS[i % len(SEARCH_COLORS)]
-                        if mode == 1:
-                            path = bfs_visualize(grid, s, t, lambda: draw_grid(grid), preserve_colors=[PATH], search_colors=search_colors)
-                        elif mode == 2:
-                            path = bidirectional_bfs(grid, s, t, lambda: draw_grid(grid), preserve_colors=[PATH], search_colors=search_colors)
-                        elif mode == 3:
-                            path = dfs_visualize(grid, s, t, lambda: draw_grid(grid), preserve_colors=[PATH], search_colors=search_colors)
-                        elif mode == 4:
-                            path = greedy_best_first_search(grid, s, t, lambda: draw_grid(grid), preserve_colors=[PATH], search_colors=search_colors)
-                        elif mode == 5:
-                            path = astar_search(grid, s, t, lambda: draw_grid(grid), preserve_colors=[PATH], search_colors=search_colors)
-                        else:
-                            path = None
-                        if path:
-                            mark_path(path, lambda: draw_grid(grid))
-                        else:
+                        search_states = cellgrid.SEARCH_STATES[i % cellgrid.PALETTES]
+                        if not components.connected(s, t):
+                            display_no_path_message(WIN, WIDTH, WIDTH)
+                            RENDERER.invalidate()
+                            break
+                        result = path_cache.get(grid.version, algorithm, s, t)
+                        cached = result is not None
+                        render = 0.0
+                        if not cached:
+                            result = visualize_search(grid, algorithm, s, t, lambda: draw_grid(grid), scheduler, preserve_states=(cellgrid.PATH,), search_states=search_states, hierarchy=hierarchy)
+                            if scheduler.cancelled:
+                                break
+                            result.elapsed = scheduler.compute_time
+                            render = scheduler.render_time
+                            path_cache.put(grid.version, algorithm, s, t, result)
+                            expanded += result.expanded
+                            searched.append((s, t))
+                        if result.found:
+                            mark_path(grid, result.path, lambda: draw_grid(grid), scheduler)
+                            if scheduler.cancelled:
+                                break
+                            render += scheduler.render_time
+                        legs.append((result, render, cached))
+                        if not result.found:
                             display_no_path_message(WIN, WIDTH, WIDTH)
+                            RENDERER.invalidate()
                             break
+                    if scheduler.cancelled:
+                        scheduler.status = "Search cancelled"
+                        scheduler.show_speed()
+                        continue
+                    scheduler.status = "%s%s - %s" % (expansion_report(grid, searched, algorithm, expanded, path_cache), order_note, path_cache.stats())
+                    scheduler.show_speed()
+                    route_points, route_algorithm = points, algorithm
+                    planners = start_replanning(grid, points, algorithm) if incremental_mode else None
+                elif event.key == pygame.K_t and start is not None and len(stops) == num_stops and end:
+                    show_instructions = False
+                    mode = vertical_menu(WIN, "Select Search Algorithm", SEARCH_OPTIONS)
+                    RENDERER.invalidate()
+                    if not 1 <= mode <= len(SEARCH_ALGORITHMS):
+                        continue
+                    algorithm = SEARCH_ALGORITHMS[mode - 1]
+                    if landmark_mode:
+                        algorithm = LANDMARK_VARIANTS.get(algorithm, algorithm)
+                    grid.clear_search()
+                    legs = []
+                    if algorithm == "hpa" and hierarchy is None:
+                        hierarchy = HierarchicalGrid(occupancy(grid))
+                    trace = record_trace(grid, [start] + stops + [end], algorithm, trace_path, hierarchy)
+                    scheduler.status = "Recorded %d events to %s" % (len(trace), trace_path)
+                    scheduler.show_speed()
+                    play_trace(trace)
+                    RENDERER.invalidate()
+                elif event.key == pygame.K_i:
+                    incremental_mode = not incremental_mode
+                    planners = start_replanning(grid, route_points, route_algorithm) if incremental_mode and route_points else None
+                    scheduler.status = "Incremental replanning: %s" % ("on" if incremental_mode else "off")
+                    scheduler.show_speed()
+                elif event.key == pygame.K_o:
+                    optimize_order = not optimize_order
+                    scheduler.status = "Optimize stop order: %s" % ("on" if optimize_order else "off")
+                    scheduler.show_speed()
+                elif pygame.K_0 <= event.key <= pygame.K_9:
+                    brush = event.key - pygame.K_0 or None
+                    scheduler.status = "Brush: %s" % ("walls" if brush is None else "terrain cost %d" % brush)
+                    scheduler.show_speed()
+                elif event.key == pygame.K_w:
+                    generate_random_terrain(grid)
+                    route_points = planners = None
+                elif event.key == pygame.K_l:
+                    landmark_mode = not landmark_mode
+                    scheduler.status = "Landmark heuristic for A* and greedy: %s" % ("on" if landmark_mode else "off")
+                    scheduler.show_speed()
                 elif event.key == pygame.K_c:
                     start = None
                     stops = []
@@ -627,20 +620,68 @@ def main():
                     placing_stops = False
                     placing_end = False
                     show_instructions = True
-                    grid = make_grid()
+                    grid = make_grid(rows, cols, blocked, weights)
+                    route_points = planners = components = hierarchy = None
+                    legs = []
                 elif event.key == pygame.K_r:
                     if start and len(stops) == num_stops and end:
                         show_instructions = False
-                        clear_grid_except_special(grid, start, stops, end)
+                        grid.clear_search()
                         generate_random_obstacles(grid, start, stops, end)
+                        route_points = planners = components = hierarchy = None
                 elif event.key == pygame.K_m:
                     if start and (len(stops) == num_stops) and end:
                         show_instructions = False
-                        clear_grid_except_special(grid, start, stops, end)
-                        recursive_division_maze_visual(grid, start, stops, end, lambda: draw_grid(grid))
+                        grid.clear_search()
+                        build_maze(grid, [start] + stops + [end], lambda: draw_grid(grid), scheduler)
+                        route_points = planners = components = hierarchy = None
+        if components is not None and changes:
+            components.update(changes)
+        if hierarchy is not None and changes:
+            hierarchy.update(changes)
+        if planners and changes:
+            replanned, found = replan_route(grid, planners, changes)
+            scheduler.status = "Replanned: %d expansions%s" % (replanned, "" if found else " - no path")
+            scheduler.show_speed()
+        stroking = drawing_obstacle or erasing_obstacle or painting_terrain
+        if start and len(stops) == num_stops and end and grid.version != checked_version and not stroking:
+            checked_version = grid.version
+            if components is None:
+                components = ComponentIndex(grid.blocked())
+            unreachable = unreachable_waypoints(components, start, stops, end)
+            if unreachable:
+                scheduler.status = "Unreachable: " + ", ".join(unreachable)
+                scheduler.show_speed()
+            elif scheduler.status.startswith("Unreachable"):
+                scheduler.status = ""
+                scheduler.show_speed()
         clock.tick(60)
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Interactive path-finding visualizer.")
+    parser.add_argument("--rows", type=int, default=GRID_SIZE)
+    parser.add_argument("--cols", type=int, default=GRID_SIZE)
+    parser.add_argument("--map", help="MovingAI .map, .npy or raw binary occupancy grid to load")
+    parser.add_argument("--shape", type=lambda text: tuple(int(v) for v in text.split("x")),
+                        help="ROWSxCOLS of a raw binary --map")
+    parser.add_argument("--trace", default=TRACE_PATH, help="file the T key records search traces to")
+    parser.add_argument("--replay", help="play back a recorded search trace and exit")
+    parser.add_argument("--weights", help=".npy or raw uint8 terrain costs from 1 to 9 (0 blocks a cell)")
+    parser.add_argument("--stops", type=int, help="number of stops to place (skips the prompt)")
+    args = parser.parse_args()
+    init_display()
+    if args.replay:
+        play_trace(traces.Trace(args.replay))
+        pygame.quit()
+        sys.exit()
+    blocked = maps.load_map(args.map, args.shape) if args.map else None
+    weights = None
+    if args.weights:
+        try:
+            walls, weights = maps.load_weights(args.weights, args.shape, cellgrid.MAX_WEIGHT)
+        except ValueError as error:
+            parser.error(str(error))
+        blocked = walls if blocked is None else np.asarray(blocked, dtype=bool) | walls
+    main(args.rows, args.cols, blocked, args.trace, args.stops, weights)
@@ -0,0 +1,249 @@
+import numpy as np
+import pygame
+
+import cellgrid
+
+
+ZOOMS = [
+    (1, 40), (1, 28), (1, 20), (1, 14), (1, 10), (1, 7), (1, 5), (1, 4), (1, 3), (1, 2), (1, 1),
+    (2, 1), (4, 1), (8, 1), (16, 1), (32, 1), (64, 1), (128, 1),
+]
+LINE_PIXELS = 5
+LINE_KEY = (255, 0, 255)
+BULK_BLOCKS = 1000
+
+DRAW_ORDER = (
+    [cellgrid.FREE]
+    + list(cellgrid.TERRAIN_STATES.values())
+    + [state for states in cellgrid.SEARCH_STATES for state in states.values()]
+    + [cellgrid.OBSTACLE, cellgrid.PATH, cellgrid.STOP, cellgrid.END, cellgrid.START]
+)
+PRIORITY = np.zeros(cellgrid.STATE_COUNT, dtype=np.uint8)
+PRIORITY[DRAW_ORDER] = np.arange(len(DRAW_ORDER))
+BY_PRIORITY = np.array(DRAW_ORDER, dtype=np.uint8)
+
+
+def halve(priority):
+    rows, cols = priority.shape
+    if rows % 2 or cols % 2:
+        priority = np.pad(priority, ((0, rows % 2), (0, cols % 2)))
+    return np.maximum(
+        np.maximum(priority[0::2, 0::2], priority[1::2, 0::2]),
+        np.maximum(priority[0::2, 1::2], priority[1::2, 1::2]),
+    )
+
+
+def unique_blocks(cells, block):
+    rows, cols = cells[:, 0] // block, cells[:, 1] // block
+    keys = np.unique(rows * (cols.max() + 1) + cols)
+    return np.stack(np.divmod(keys, cols.max() + 1), axis=1)
+
+
+def update_halved(coarse, fine, blocks):
+    span = np.arange(2)
+    rows = np.minimum(blocks[:, 0, None, None] * 2 + span[None, :, None], fine.shape[0] - 1)
+    cols = np.minimum(blocks[:, 1, None, None] * 2 + span[None, None, :], fine.shape[1] - 1)
+    coarse[blocks[:, 0], blocks[:, 1]] = fine[rows, cols].max(axis=(1, 2))
+
+
+class GridRenderer:
+    def __init__(self, surface, area, colors, line_color):
+        self.surface = surface
+        self.area = pygame.Rect(area)
+        self.colors = colors
+        self.line_color = line_color
+        self.canvas = None
+        self.rows = self.cols = 0
+        self.level = 0
+        self.x = self.y = 0.0
+        self.overlay = None
+        self.grid = None
+        self.full_repaint = True
+        self.levels = []
+
+    @property
+    def lines(self):
+        block, pixels = ZOOMS[self.level]
+        return block == 1 and pixels >= LINE_PIXELS
+
+    def invalidate(self):
+        self.full_repaint = True
+
+    def fit(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.level = len(ZOOMS) - 1
+        for level, (block, pixels) in enumerate(ZOOMS):
+            if rows * pixels <= self.area.width * block and cols * pixels <= self.area.height * block:
+                self.level = level
+                break
+        self.x = self.y = 0.0
+        self.overlay = None
+        self.invalidate()
+
+    def origin(self):
+        block = ZOOMS[self.level][0]
+        return int(self.x) // block * block, int(self.y) // block * block
+
+    def extent(self, x0, y0):
+        block, pixels = ZOOMS[self.level]
+        return (
+            min(-(-self.area.width // pixels), -(-(self.rows - x0) // block)),
+            min(-(-self.area.height // pixels), -(-(self.cols - y0) // block)),
+        )
+
+    def clamp(self):
+        block, pixels = ZOOMS[self.level]
+        self.x = min(max(self.x, 0.0), max(self.rows - self.area.width * block / pixels, 0.0))
+        self.y = min(max(self.y, 0.0), max(self.cols - self.area.height * block / pixels, 0.0))
+
+    def cell_at(self, pos):
+        if not self.area.collidepoint(pos):
+            return None
+        block, pixels = ZOOMS[self.level]
+        x0, y0 = self.origin()
+        row = x0 + (pos[0] - self.area.x) * block // pixels
+        col = y0 + (pos[1] - self.area.y) * block // pixels
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return (row, col)
+        return None
+
+    def zoom(self, steps, pos=None):
+        level = min(max(self.level - steps, 0), len(ZOOMS) - 1)
+        if level == self.level:
+            return
+        if pos is None or not self.area.collidepoint(pos):
+            pos = self.area.center
+        dx, dy = pos[0] - self.area.x, pos[1] - self.area.y
+        block, pixels = ZOOMS[self.level]
+        x = self.x + dx * block / pixels
+        y = self.y + dy * block / pixels
+        self.level = level
+        block, pixels = ZOOMS[level]
+        self.x = x - dx * block / pixels
+        self.y = y - dy * block / pixels
+        self.clamp()
+        self.overlay = None
+        self.invalidate()
+
+    def pan(self, dx, dy):
+        block, pixels = ZOOMS[self.level]
+        before = self.origin()
+        self.x -= dx * block / pixels
+        self.y -= dy * block / pixels
+        self.clamp()
+        if self.origin() != before:
+            self.invalidate()
+
+    def grid_lines(self):
+        if self.overlay is None:
+            self.overlay = pygame.Surface(self.area.size)
+            self.overlay.fill(LINE_KEY)
+            self.overlay.set_colorkey(LINE_KEY)
+            pixels = ZOOMS[self.level][1]
+            width, height = self.area.size
+            for x in range(0, width, pixels):
+                pygame.draw.line(self.overlay, self.line_color, (x, 0), (x, height))
+                pygame.draw.line(self.overlay, self.line_color, (x + pixels - 1, 0), (x + pixels - 1, height))
+            for y in range(0, height, pixels):
+                pygame.draw.line(self.overlay, self.line_color, (0, y), (width, y))
+                pygame.draw.line(self.overlay, self.line_color, (0, y + pixels - 1), (width, y + pixels - 1))
+        return self.overlay
+
+    def paint(self, states):
+        pixels = ZOOMS[self.level][1]
+        self.surface.fill(self.colors[cellgrid.FREE], self.area)
+        if states.size:
+            if self.canvas is None or self.canvas.get_size() != states.shape:
+                self.canvas = pygame.Surface(states.shape, depth=8)
+                self.canvas.set_palette(self.colors)
+            pygame.surfarray.blit_array(self.canvas, states)
+            image = self.canvas
+            if pixels > 1:
+                image = pygame.transform.scale(image, (states.shape[0] * pixels, states.shape[1] * pixels))
+            self.surface.blit(image, self.area)
+            if self.lines:
+                self.surface.blit(self.grid_lines(), self.area, (0, 0) + image.get_size())
+
+    def draw_block(self, bx, by, state):
+        pixels = ZOOMS[self.level][1]
+        rect = pygame.Rect(self.area.x + bx * pixels, self.area.y + by * pixels, pixels, pixels)
+        pygame.draw.rect(self.surface, self.colors[state], rect)
+        if self.lines:
+            pygame.draw.rect(self.surface, self.line_color, rect, 1)
+        return rect
+
+    def refresh(self, grid, block):
+        cells = np.array(list(grid.changed)) if grid.changed else None
+        if grid.repaint or not self.levels:
+            self.levels = [PRIORITY[grid.state]]
+        elif cells is not None:
+            self.levels[0][cells[:, 0], cells[:, 1]] = PRIORITY[grid.state[cells[:, 0], cells[:, 1]]]
+            blocks = cells
+            for fine, coarse in zip(self.levels, self.levels[1:]):
+                blocks = unique_blocks(blocks, 2)
+                update_halved(coarse, fine, blocks)
+        while 1 << len(self.levels) <= block:
+            self.levels.append(halve(self.levels[-1]))
+        grid.changed.clear()
+        grid.repaint = False
+        if cells is None:
+            return ()
+        return unique_blocks(cells, block)
+
+    def flush(self, grid):
+        if grid is not self.grid:
+            if (grid.rows, grid.cols) != (self.rows, self.cols):
+                self.fit(grid.rows, grid.cols)
+            self.grid = grid
+            self.full_repaint = True
+            self.levels = []
+        block = ZOOMS[self.level][0]
+        x0, y0 = self.origin()
+        nx, ny = self.extent(x0, y0)
+        bx0, by0 = x0 // block, y0 // block
+        if grid.repaint or not self.levels:
+            self.full_repaint = True
+        blocks = self.refresh(grid, block)
+        priority = self.levels[block.bit_length() - 1][bx0:bx0 + nx, by0:by0 + ny]
+        self.surface.set_clip(self.area)
+        if self.full_repaint or len(blocks) > BULK_BLOCKS:
+            self.paint(BY_PRIORITY[priority])
+            self.surface.set_clip(None)
+            self.full_repaint = False
+            pygame.display.update(self.area)
+            return
+        rects = []
+        for bx, by in blocks:
+            bx -= bx0
+            by -= by0
+            if 0 <= bx < nx and 0 <= by < ny:
+                rects.append(self.draw_block(bx, by, BY_PRIORITY[priority[bx, by]]))
+        self.surface.set_clip(None)
+        if rects:
+            pygame.display.update(rects)
+
+
+class InfoPanel:
+    def __init__(self, surface, area, font, color, background, spacing=4):
+        self.surface = surface
+        self.area = pygame.Rect(area)
+        self.font = font
+        self.color = color
+        self.background = background
+        self.spacing = spacing
+        self.lines = None
+
+    def show(self, lines):
+        lines = list(lines)
+        if lines == self.lines:
+            return
+        self.lines = lines
+        self.surface.fill(self.background, self.area)
+        y = self.area.y + self.spacing
+        for line in lines:
+            text = self.font.render(line, True, self.color)
+            if y + text.get_height() > self.area.bottom:
+                break
+            self.surface.blit(text, (self.area.x + 20, y))
+            y += text.get_height() + self.spacing
+        pygame.display.update(self.area)
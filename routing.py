@@ -0,0 +1,102 @@
+import math
+
+import engine
+
+EXACT_LIMIT = 12
+
+
+def distance_matrix(grid, points):
+    matrix = []
+    for source in points:
+        row = engine.distances_to(grid, source, points)
+        matrix.append([math.inf if distance is None else distance for distance in row])
+    return matrix
+
+
+def route_length(matrix, order):
+    return sum(matrix[a][b] for a, b in zip(order, order[1:]))
+
+
+def held_karp(matrix):
+    n = len(matrix)
+    k = n - 2
+    last = n - 1
+    if k <= 0:
+        return list(range(n))
+    size = 1 << k
+    cost = [[math.inf] * k for _ in range(size)]
+    back = [[-1] * k for _ in range(size)]
+    for j in range(k):
+        cost[1 << j][j] = matrix[0][j + 1]
+    for mask in range(1, size):
+        row = cost[mask]
+        for j in range(k):
+            current = row[j]
+            if current == math.inf or not mask >> j & 1:
+                continue
+            distances = matrix[j + 1]
+            for nxt in range(k):
+                if mask >> nxt & 1:
+                    continue
+                new_mask = mask | 1 << nxt
+                candidate = current + distances[nxt + 1]
+                if candidate < cost[new_mask][nxt]:
+                    cost[new_mask][nxt] = candidate
+                    back[new_mask][nxt] = j
+    full = size - 1
+    best = min(range(k), key=lambda j: cost[full][j] + matrix[j + 1][last])
+    order = []
+    mask = full
+    j = best
+    while j != -1:
+        order.append(j + 1)
+        j, mask = back[mask][j], mask ^ (1 << j)
+    order.reverse()
+    return [0] + order + [last]
+
+
+def nearest_neighbor(matrix):
+    n = len(matrix)
+    unvisited = set(range(1, n - 1))
+    order = [0]
+    while unvisited:
+        distances = matrix[order[-1]]
+        nxt = min(unvisited, key=lambda j: (distances[j], j))
+        order.append(nxt)
+        unvisited.remove(nxt)
+    order.append(n - 1)
+    return order
+
+
+def two_opt(matrix, order):
+    order = list(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(order) - 2):
+            for j in range(i + 1, len(order) - 1):
+                a, b, c, d = order[i - 1], order[i], order[j], order[j + 1]
+                if matrix[a][c] + matrix[b][d] < matrix[a][b] + matrix[c][d]:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    improved = True
+    return order
+
+
+def best_order(matrix, exact_limit=EXACT_LIMIT):
+    if any(distance == math.inf for distance in matrix[0]):
+        return None
+    if len(matrix) - 2 <= exact_limit:
+        return held_karp(matrix)
+    return two_opt(matrix, nearest_neighbor(matrix))
+
+
+def order_stops(grid, start, stops, end, exact_limit=EXACT_LIMIT, pool=None):
+    points = [start] + stops + [end]
+    if pool is not None:
+        matrix = pool.distance_matrix(points)
+    else:
+        matrix = distance_matrix(grid, points)
+    order = best_order(matrix, exact_limit)
+    if order is None:
+        return None, None
+    return [points[i] for i in order[1:-1]], route_length(matrix, order)
@@ -0,0 +1,170 @@
+from collections import deque
+import queue
+import sys
+import threading
+import time
+
+import pygame
+
+SPEEDS = [
+    ("Step", 0),
+    ("Slow", 1),
+    ("Medium", 8),
+    ("Fast", 64),
+    ("Very fast", 1024),
+    ("Instant", None),
+]
+BATCH = 256
+BACKLOG = 64
+
+
+class SearchWorker:
+    def __init__(self, steps, batch=BATCH, backlog=BACKLOG):
+        self.steps = steps
+        self.batch = batch
+        self.events = queue.Queue(backlog)
+        self.stopped = threading.Event()
+        self.compute_time = 0.0
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def work(self):
+        clock = time.perf_counter
+        try:
+            while not self.stopped.is_set():
+                batch = []
+                began = clock()
+                try:
+                    while len(batch) < self.batch:
+                        batch.append(next(self.steps))
+                except StopIteration as stop:
+                    self.compute_time += clock() - began
+                    self.send((batch, True, stop.value, None))
+                    return
+                self.compute_time += clock() - began
+                self.send((batch, False, None, None))
+        except Exception as error:
+            self.send(([], True, None, error))
+        finally:
+            self.steps.close()
+
+    def send(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.events.put(item, timeout=0.05)
+                return
+            except queue.Full:
+                pass
+
+    def receive(self, timeout):
+        try:
+            return self.events.get(timeout=max(timeout, 0))
+        except queue.Empty:
+            return None
+
+    def cancel(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+class AnimationScheduler:
+    def __init__(self, title, fps=60, budget=0.75, speed=3):
+        self.title = title
+        self.status = ""
+        self.fps = fps
+        self.budget = budget / fps
+        self.speed = speed
+        self.clock = pygame.time.Clock()
+        self.compute_time = 0.0
+        self.render_time = 0.0
+        self.paused = False
+        self.cancelled = False
+
+    @property
+    def speed_name(self):
+        return SPEEDS[self.speed][0]
+
+    def show_speed(self):
+        caption = "%s - Speed: %s" % (self.title, self.speed_name)
+        if self.paused:
+            caption += " (paused)"
+        if self.status:
+            caption += " - " + self.status
+        pygame.display.set_caption(caption)
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        if event.type != pygame.KEYDOWN:
+            return 0
+        if event.key == pygame.K_UP:
+            self.speed = min(self.speed + 1, len(SPEEDS) - 1)
+            self.show_speed()
+        elif event.key == pygame.K_DOWN:
+            self.speed = max(self.speed - 1, 0)
+            self.show_speed()
+        elif event.key == pygame.K_p:
+            self.paused = not self.paused
+            self.show_speed()
+        elif event.key == pygame.K_ESCAPE:
+            self.cancelled = True
+        elif event.key == pygame.K_RIGHT and (self.paused or SPEEDS[self.speed][1] == 0):
+            return 1
+        return 0
+
+    def run(self, steps, apply, flush):
+        clock = time.perf_counter
+        worker = SearchWorker(steps)
+        pending = deque()
+        done = False
+        result = error = None
+        render = 0.0
+        self.paused = self.cancelled = False
+        try:
+            while True:
+                stepped = 0
+                for event in pygame.event.get():
+                    stepped += self.handle_event(event)
+                if self.cancelled:
+                    result = None
+                    break
+                limit = SPEEDS[self.speed][1]
+                if limit == 0 or self.paused:
+                    limit = stepped
+                deadline = clock() + self.budget
+                count = 0
+                while limit is None or count < limit:
+                    if not pending:
+                        if done:
+                            break
+                        received = worker.receive(deadline - clock())
+                        if received is None:
+                            break
+                        batch, done, result, error = received
+                        pending.extend(batch)
+                        continue
+                    began = clock()
+                    kind, pos = pending.popleft()
+                    apply(kind, pos)
+                    ended = clock()
+                    render += ended - began
+                    count += 1
+                    if ended >= deadline:
+                        break
+                began = clock()
+                flush()
+                render += clock() - began
+                if error is not None:
+                    raise error
+                if done and not pending:
+                    break
+                self.clock.tick(self.fps)
+        finally:
+            worker.cancel()
+            if self.paused:
+                self.paused = False
+                self.show_speed()
+        self.compute_time = worker.compute_time
+        self.render_time = render
+        return result
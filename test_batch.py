@@ -0,0 +1,21 @@
+import numpy as np
+
+from batch import BatchSearch
+import engine
+from test_engine import SEEDS, bfs_cost, check_path, random_blocked, random_pairs
+
+
+def test_batch_search_matches_bfs():
+    for seed in SEEDS:
+        rng = np.random.default_rng(seed)
+        blocked = random_blocked(rng)
+        pairs = random_pairs(rng, blocked, 6)
+        if not pairs:
+            continue
+        pairs += [(pairs[0][0], end) for _, end in pairs]
+        pairs.append(((0, 0), pairs[0][1]))
+        for i, result in BatchSearch(engine.OccupancyGrid(blocked)).search(pairs):
+            start, end = pairs[i]
+            assert result.cost == bfs_cost(blocked, start, end)
+            if result.found:
+                check_path(blocked, result.path, start, end, result.cost)
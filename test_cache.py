@@ -0,0 +1,45 @@
+import numpy as np
+
+import cache
+from cache import PathCache
+import engine
+
+
+def result(length):
+    return engine.SearchResult([(0, i) for i in range(length)], length)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    size = PathCache.entry_size(result(4))
+    paths = PathCache(max_bytes=3 * size)
+    for name in "abc":
+        paths.put(1, "astar", name, "t", result(4))
+    assert paths.get(1, "astar", "a", "t") is not None
+    paths.put(1, "astar", "d", "t", result(4))
+    assert [key[2] for key in paths.entries] == ["c", "a", "d"]
+    assert paths.bytes == 3 * size
+
+
+def test_entries_are_bounded_by_max_bytes():
+    paths = PathCache(max_bytes=cache.ENTRY_BYTES + 10 * cache.CELL_BYTES)
+    paths.put(1, "astar", "s", "t", result(11))
+    assert len(paths) == 0 and paths.bytes == 0
+    paths.put(1, "astar", "s", "t", result(6))
+    paths.put(1, "astar", "s", "u", result(6))
+    assert len(paths) == 1 and paths.get(1, "astar", "s", "u") is not None
+    assert paths.bytes == PathCache.entry_size(result(6))
+    paths.put(1, "astar", "s", "u", result(2))
+    assert paths.bytes == PathCache.entry_size(result(2))
+    paths.clear()
+    assert len(paths) == 0 and paths.bytes == 0
+
+
+def test_search_counts_hits_and_misses_per_version():
+    grid = engine.OccupancyGrid(np.zeros((5, 5), dtype=bool))
+    paths = PathCache()
+    first = paths.search(1, grid, (0, 0), (4, 4))
+    assert paths.search(1, grid, (0, 0), (4, 4)) is first
+    assert paths.search(2, grid, (0, 0), (4, 4)) is not first
+    assert paths.search(1, grid, (0, 0), (4, 4), "bfs") is not first
+    assert (paths.hits, paths.misses) == (1, 3)
+    assert paths.stats() == "cache 1 hits / 3 misses"
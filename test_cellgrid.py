@@ -0,0 +1,58 @@
+import numpy as np
+
+import cellgrid
+from cellgrid import CellGrid
+
+
+def test_only_edits_to_walls_and_costs_change_the_version():
+    grid = CellGrid(6, 8)
+    version = grid.version
+    grid.set((0, 0), cellgrid.START)
+    grid.set((5, 7), cellgrid.END)
+    grid.set((2, 2), cellgrid.SEARCH_STATES[0]["VISITED"])
+    grid.set((2, 3), cellgrid.PATH)
+    grid.clear_search()
+    assert grid.version == version
+    grid.set((3, 3), cellgrid.OBSTACLE)
+    assert grid.version > version
+    version = grid.version
+    grid.set((3, 3), cellgrid.OBSTACLE)
+    assert grid.version == version
+    grid.set((3, 3), cellgrid.FREE)
+    assert grid.version > version
+    version = grid.version
+    grid.set_weight((1, 1), 5)
+    assert grid.version > version
+    version = grid.version
+    grid.set_weight((1, 1), 5)
+    assert grid.version == version
+
+
+def test_bulk_edits_change_the_version_only_when_walls_move():
+    grid = CellGrid(6, 8)
+    version = grid.version
+    grid.fill(np.zeros((6, 8), dtype=bool), cellgrid.FREE)
+    grid.put(np.array([3, 4]), np.array([cellgrid.PATH, cellgrid.PATH], dtype=np.uint8))
+    assert grid.version == version
+    grid.put(np.array([5]), np.array([cellgrid.OBSTACLE], dtype=np.uint8))
+    assert grid.version > version
+    version = grid.version
+    grid.clear()
+    assert grid.version > version and not grid.blocked().any()
+    version = grid.version
+    grid.fill_weights(np.full((6, 8), 3, dtype=np.uint8))
+    assert grid.version > version
+
+
+def test_free_cells_show_their_terrain():
+    grid = CellGrid(3, 3)
+    grid.set_weight((1, 1), 4)
+    assert grid.get((1, 1)) == cellgrid.TERRAIN_STATES[4]
+    grid.set((1, 1), cellgrid.PATH)
+    grid.clear_search()
+    assert grid.get((1, 1)) == cellgrid.TERRAIN_STATES[4]
+    grid.set((1, 1), cellgrid.OBSTACLE)
+    grid.set_weight((1, 1), 2)
+    assert grid.is_obstacle((1, 1))
+    grid.set((1, 1), cellgrid.FREE)
+    assert grid.get((1, 1)) == cellgrid.TERRAIN_STATES[2]
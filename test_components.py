@@ -0,0 +1,16 @@
+import numpy as np
+
+from components import ComponentIndex
+from test_engine import SEEDS, bfs_cost, random_blocked, random_changes, random_pairs
+
+
+def test_component_index_matches_bfs():
+    for seed in SEEDS:
+        rng = np.random.default_rng(seed)
+        blocked = random_blocked(rng)
+        components = ComponentIndex(blocked)
+        edited = blocked.copy()
+        for _ in range(4):
+            for start, end in random_pairs(rng, edited, 6):
+                assert components.connected(start, end) == (bfs_cost(edited, start, end) is not None)
+            components.update(random_changes(rng, edited, ()))
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+import engine
+
+SEEDS = range(20)
+
+
+def random_blocked(rng, rows=14, cols=19):
+    return rng.random((rows, cols)) < rng.uniform(0.0, 0.4)
+
+
+def random_pairs(rng, blocked, count=4):
+    free = np.argwhere(~blocked)
+    if len(free) == 0:
+        return []
+    return [tuple(tuple(int(v) for v in free[i]) for i in rng.integers(len(free), size=2)) for _ in range(count)]
+
+
+def random_changes(rng, blocked, protected, count=12):
+    changes = []
+    for _ in range(count):
+        pos = tuple(int(v) for v in rng.integers(blocked.shape))
+        if pos not in protected:
+            changes.append((pos, not blocked[pos]))
+            blocked[pos] = not blocked[pos]
+    return changes
+
+
+def check_path(blocked, path, start, end, cost, weights=None):
+    assert path[0] == start and path[-1] == end
+    for a, b in zip(path, path[1:]):
+        assert abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+    assert not any(blocked[pos] for pos in path)
+    if weights is None:
+        assert len(path) - 1 == cost
+    else:
+        assert sum(int(weights[pos]) for pos in path[1:]) == cost
+
+
+def bfs_cost(blocked, start, end):
+    return engine.search(engine.OccupancyGrid(blocked), start, end, "bfs").cost
+
+
+@pytest.mark.parametrize("algorithm", sorted(engine.ALGORITHMS))
+def test_algorithms_match_bfs(algorithm):
+    optimal = algorithm not in ("dfs", "greedy", "greedy-alt")
+    for seed in SEEDS:
+        rng = np.random.default_rng(seed)
+        blocked = random_blocked(rng)
+        grid = engine.OccupancyGrid(blocked)
+        for start, end in random_pairs(rng, blocked):
+            expected = bfs_cost(blocked, start, end)
+            result = engine.search(grid, start, end, algorithm)
+            assert result.found == (expected is not None)
+            if result.found:
+                check_path(blocked, result.path, start, end, result.cost)
+                if optimal:
+                    assert result.cost == expected
+                else:
+                    assert result.cost >= expected
+
+
+@pytest.mark.parametrize("algorithm", sorted(engine.ALGORITHMS))
+def test_blocked_endpoints_have_no_path(algorithm):
+    blocked = np.zeros((5, 5), dtype=bool)
+    blocked[1, 1] = True
+    grid = engine.OccupancyGrid(blocked)
+    assert not engine.search(grid, (1, 1), (4, 4), algorithm).found
+    assert not engine.search(grid, (4, 4), (1, 1), algorithm).found
+
+
+@pytest.mark.parametrize("algorithm", ["dijkstra", "terrain-astar", "dial", "dial-astar"])
+def test_weighted_algorithms_agree(algorithm):
+    for seed in SEEDS:
+        rng = np.random.default_rng(seed)
+        blocked = random_blocked(rng)
+        weights = rng.integers(1, 10, blocked.shape, dtype=np.uint8)
+        grid = engine.OccupancyGrid(blocked, weights)
+        for start, end in random_pairs(rng, blocked):
+            expected = engine.search(grid, start, end, "dijkstra")
+            result = engine.search(grid, start, end, algorithm)
+            assert result.cost == expected.cost
+            if result.found:
+                check_path(blocked, result.path, start, end, result.cost, weights)
+
+
+def test_search_buffers_are_pooled_per_grid():
+    grid = engine.OccupancyGrid(np.zeros((30, 30), dtype=bool))
+    first = engine.search_steps(grid, (0, 0), (29, 29))
+    second = engine.search_steps(grid, (29, 0), (0, 29))
+    for _ in range(50):
+        next(first)
+        next(second)
+    assert engine.run(first).cost == 58
+    assert engine.run(second).cost == 58
+    assert len(grid.buffer_pool) == 2
+    engine.search(grid, (0, 0), (5, 5))
+    assert len(grid.buffer_pool) == 2
+
+
+@pytest.mark.parametrize("algorithm", ["alt", "greedy-alt"])
+def test_landmark_table_is_built_on_the_first_step(algorithm):
+    grid = engine.OccupancyGrid(np.zeros((20, 20), dtype=bool))
+    steps = engine.search_steps(grid, (0, 0), (19, 19), algorithm)
+    assert grid.landmark_table is None
+    next(steps)
+    assert grid.landmark_table is not None
+    assert engine.run(steps).cost == 38
@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+
+import generators
+
+
+def wall_mask(rows, cols, walls):
+    blocked = np.zeros(rows * cols, dtype=bool)
+    blocked[walls] = True
+    return blocked.reshape(rows, cols)
+
+
+def test_division_walls_never_cover_protected_cells():
+    for seed in range(10):
+        random.seed(seed)
+        protected = [(0, 0), (1, 1), (7, 12), (20, 30), (30, 40), (15, 3)]
+        blocked = wall_mask(31, 41, generators.division_walls(31, 41, protected))
+        assert not any(blocked[pos] for pos in protected)
+
+
+def test_inner_division_walls_fall_on_odd_lines():
+    for seed in range(10):
+        random.seed(seed)
+        walls = generators.division_walls(33, 47)
+        assert len(np.unique(walls)) == len(walls)
+        rows, cols = np.divmod(walls, 47)
+        inner = (rows > 0) & (rows < 32) & (cols > 0) & (cols < 46)
+        assert np.all((rows[inner] % 2 == 1) | (cols[inner] % 2 == 1))
+        blocked = wall_mask(33, 47, walls)
+        assert blocked[0, :].all() and blocked[:, 0].all() and blocked[-1, :].all() and blocked[:, -1].all()
+
+
+def test_division_walls_are_reproducible_from_the_seed():
+    random.seed(42)
+    first = generators.division_walls(25, 35)
+    random.seed(42)
+    second = generators.division_walls(25, 35)
+    random.seed(43)
+    third = generators.division_walls(25, 35)
+    assert np.array_equal(first, second)
+    assert not np.array_equal(first, third)
+
+
+def test_random_obstacles_leave_protected_cells_open():
+    random.seed(0)
+    protected = [(0, 0), (10, 10), (49, 49)]
+    blocked = generators.random_obstacle_mask(50, 50, protected, 0.9)
+    assert not any(blocked[pos] for pos in protected)
+    assert 0.8 < blocked.mean() < 0.95
@@ -0,0 +1,23 @@
+import numpy as np
+
+import engine
+from hierarchy import HierarchicalGrid
+from test_engine import SEEDS, bfs_cost, check_path, random_blocked, random_changes, random_pairs
+
+
+def test_hierarchical_grid_matches_bfs():
+    for seed in SEEDS:
+        rng = np.random.default_rng(seed)
+        blocked = random_blocked(rng, 37, 41)
+        hierarchy = HierarchicalGrid(engine.OccupancyGrid(blocked), cluster=8)
+        pairs = random_pairs(rng, blocked)
+        for edit in range(2):
+            if edit:
+                hierarchy.update(random_changes(rng, blocked, {pos for pair in pairs for pos in pair}))
+            for start, end in pairs:
+                expected = bfs_cost(blocked, start, end)
+                result = hierarchy.search(start, end)
+                assert result.found == (expected is not None)
+                if result.found:
+                    check_path(blocked, result.path, start, end, result.cost)
+                    assert result.cost >= expected
@@ -0,0 +1,54 @@
+import numpy as np
+
+import engine
+from incremental import LPAStar
+from test_engine import SEEDS, bfs_cost, check_path, random_blocked, random_changes, random_pairs
+
+
+def dijkstra_cost(blocked, weights, start, end):
+    return engine.search(engine.OccupancyGrid(blocked, weights), start, end, "dijkstra").cost
+
+
+def test_lpa_star_update_cells_matches_bfs():
+    for seed in SEEDS:
+        rng = np.random.default_rng(seed)
+        blocked = random_blocked(rng)
+        for start, end in random_pairs(rng, blocked, 2):
+            planner = LPAStar(engine.OccupancyGrid(blocked), start, end)
+            assert planner.cost == bfs_cost(blocked, start, end)
+            edited = blocked.copy()
+            for _ in range(3):
+                planner.update_cells(random_changes(rng, edited, {start, end}))
+                assert planner.cost == bfs_cost(edited, start, end)
+                if planner.cost is not None:
+                    check_path(edited, planner.path(), start, end, planner.cost)
+
+
+def test_weighted_lpa_star_follows_terrain_costs():
+    blocked = np.zeros((5, 9), dtype=bool)
+    weights = np.full(blocked.shape, 9, dtype=np.uint8)
+    weights[0, :] = 1
+    weights[:, 8] = 1
+    weights[:, 0] = 1
+    planner = LPAStar(engine.OccupancyGrid(blocked, weights), (2, 0), (2, 8), weighted=True)
+    assert planner.cost == dijkstra_cost(blocked, weights, (2, 0), (2, 8)) == 12
+    blocked[4, 4] = True
+    planner.update_cells([((4, 4), True)])
+    assert planner.cost == 12
+    check_path(blocked, planner.path(), (2, 0), (2, 8), 12, weights)
+
+
+def test_weighted_lpa_star_update_cells_matches_dijkstra():
+    for seed in SEEDS:
+        rng = np.random.default_rng(seed)
+        blocked = random_blocked(rng)
+        weights = rng.integers(1, 10, blocked.shape, dtype=np.uint8)
+        for start, end in random_pairs(rng, blocked, 2):
+            planner = LPAStar(engine.OccupancyGrid(blocked, weights), start, end, weighted=True)
+            assert planner.cost == dijkstra_cost(blocked, weights, start, end)
+            edited = blocked.copy()
+            for _ in range(3):
+                planner.update_cells(random_changes(rng, edited, {start, end}))
+                assert planner.cost == dijkstra_cost(edited, weights, start, end)
+                if planner.cost is not None:
+                    check_path(edited, planner.path(), start, end, planner.cost, weights)
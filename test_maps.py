@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import maps
+
+
+def test_map_round_trip(tmp_path):
+    blocked = np.random.default_rng(0).random((7, 4)) < 0.3
+    path = str(tmp_path / "round.map")
+    maps.write_map(path, blocked)
+    assert np.array_equal(maps.read_map(path), blocked)
+    assert np.array_equal(maps.load_map(path), blocked)
+
+
+def test_map_cells_are_indexed_x_first(tmp_path):
+    path = tmp_path / "tiny.map"
+    path.write_bytes(b"type octile\r\nheight 2\r\nwidth 3\r\nmap\r\n.@T\r\nGS.\r\n")
+    blocked = maps.read_map(str(path))
+    assert blocked.shape == (3, 2)
+    assert blocked[1, 0] and blocked[2, 0]
+    assert not blocked[0, 0] and not blocked[0, 1] and not blocked[1, 1] and not blocked[2, 1]
+
+
+def test_map_with_missing_rows_is_rejected(tmp_path):
+    path = tmp_path / "short.map"
+    path.write_bytes(b"type octile\nheight 3\nwidth 2\nmap\n..\n..\n")
+    with pytest.raises(ValueError):
+        maps.read_map(str(path))
+
+
+def test_read_scenarios_skips_the_version_line(tmp_path):
+    path = tmp_path / "tiny.map.scen"
+    path.write_text("version 1\n0\ttiny.map\t3\t2\t0\t0\t2\t1\t3.41421356\n1\ttiny.map\t3\t2\t2\t1\t0\t0\t3\n")
+    scenarios = maps.read_scenarios(str(path))
+    assert len(scenarios) == 2
+    first = scenarios[0]
+    assert (first.bucket, first.map_name, first.width, first.height) == (0, "tiny.map", 3, 2)
+    assert first.start == (0, 0) and first.goal == (2, 1)
+    assert first.optimal == pytest.approx(3.41421356)
+
+
+@pytest.mark.parametrize("name", ["grid.npy", "grid.bin"])
+def test_binary_grids_are_memory_mapped(tmp_path, name):
+    blocked = np.random.default_rng(1).random((5, 9)) < 0.4
+    path = str(tmp_path / name)
+    maps.save_binary(path, blocked)
+    loaded = maps.load_map(path, blocked.shape)
+    assert isinstance(loaded, np.memmap)
+    assert np.array_equal(loaded.astype(bool), blocked)
+
+
+def test_raw_grids_need_a_shape(tmp_path):
+    path = str(tmp_path / "grid.bin")
+    maps.save_binary(path, np.zeros((2, 2), dtype=bool))
+    with pytest.raises(ValueError):
+        maps.load_map(path)
+
+
+def test_weights_mark_zero_cost_cells_blocked(tmp_path):
+    weights = np.array([[1, 0, 9], [3, 12, 1]], dtype=np.uint8)
+    path = str(tmp_path / "costs.npy")
+    np.save(path, weights)
+    walls, loaded = maps.load_weights(path)
+    assert np.array_equal(walls, weights == 0)
+    assert np.array_equal(loaded, weights)
+    with pytest.raises(ValueError):
+        maps.load_weights(path, max_weight=9)
+
+
+def test_endpoints_are_opposite_corners_of_the_largest_component():
+    blocked = np.zeros((6, 8), dtype=bool)
+    blocked[:, 2] = True
+    blocked[0, 3:5] = True
+    assert maps.endpoints(blocked) == ((1, 3), (5, 7))
@@ -0,0 +1,25 @@
+import math
+
+import numpy as np
+
+import engine
+from parallel import RoutePool
+from test_engine import bfs_cost, random_blocked, random_pairs
+
+
+def test_route_pool_matches_serial_search():
+    rng = np.random.default_rng(0)
+    blocked = random_blocked(rng, 30, 40)
+    weights = rng.integers(1, 10, blocked.shape, dtype=np.uint8)
+    grid = engine.OccupancyGrid(blocked, weights)
+    points = [pos for pair in random_pairs(rng, blocked, 3) for pos in pair]
+    with RoutePool(blocked, 2, weights) as pool:
+        for algorithm in ("astar", "dial"):
+            expected = [result.cost for result in engine.solve_route(grid, points, algorithm)]
+            actual = [result.cost for result in pool.solve_route(points, algorithm)]
+            assert actual[:len(expected)] == expected
+        matrix = pool.distance_matrix(points)
+    for i, source in enumerate(points):
+        for j, target in enumerate(points):
+            expected = bfs_cost(blocked, source, target)
+            assert matrix[i][j] == (math.inf if expected is None else expected)
@@ -0,0 +1,57 @@
+import itertools
+
+import numpy as np
+
+import engine
+import routing
+
+
+def random_matrix(rng, n):
+    points = rng.integers(0, 50, (n, 2))
+    return [[int(abs(a - b).sum()) for b in points] for a in points]
+
+
+def brute_force_length(matrix):
+    n = len(matrix)
+    return min(
+        routing.route_length(matrix, [0] + list(middle) + [n - 1])
+        for middle in itertools.permutations(range(1, n - 1))
+    )
+
+
+def test_held_karp_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for n in range(2, 9):
+        for _ in range(5):
+            matrix = random_matrix(rng, n)
+            order = routing.held_karp(matrix)
+            assert sorted(order) == list(range(n))
+            assert order[0] == 0 and order[-1] == n - 1
+            assert routing.route_length(matrix, order) == brute_force_length(matrix)
+
+
+def test_two_opt_returns_a_permutation_no_longer_than_its_input():
+    rng = np.random.default_rng(1)
+    for n in (3, 6, 15, 30):
+        matrix = random_matrix(rng, n)
+        start = routing.nearest_neighbor(matrix)
+        order = routing.two_opt(matrix, start)
+        assert sorted(order) == list(range(n))
+        assert order[0] == 0 and order[-1] == n - 1
+        assert routing.route_length(matrix, order) <= routing.route_length(matrix, start)
+
+
+def test_order_stops_finds_the_shortest_visiting_order():
+    grid = engine.OccupancyGrid(np.zeros((10, 10), dtype=bool))
+    stops = [(9, 0), (0, 9), (5, 5), (0, 1)]
+    ordered, length = routing.order_stops(grid, (0, 0), stops, (9, 9))
+    assert sorted(ordered) == sorted(stops)
+    matrix = routing.distance_matrix(grid, [(0, 0)] + stops + [(9, 9)])
+    assert length == brute_force_length(matrix)
+
+
+def test_order_stops_reports_unreachable_stops():
+    blocked = np.zeros((10, 10), dtype=bool)
+    blocked[4, :] = True
+    grid = engine.OccupancyGrid(blocked)
+    assert routing.order_stops(grid, (0, 0), [(1, 5), (8, 8)], (0, 9)) == (None, None)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import cellgrid
+import traces
+
+
+def replay(initial, recorder, step):
+    state = initial.ravel().copy()
+    for index, code in zip(recorder.indices[:step], recorder.codes[:step]):
+        state[index] = code
+    return state.reshape(initial.shape)
+
+
+def test_recorder_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    initial = rng.integers(0, 4, (9, 13), dtype=np.uint8)
+    recorder = traces.TraceRecorder(initial)
+    for leg in range(3):
+        for _ in range(300):
+            recorder.record(int(rng.integers(initial.size)), int(rng.integers(cellgrid.STATE_COUNT)))
+        recorder.end_leg()
+    path = str(tmp_path / "random.pft")
+    recorder.save(path, keyframe=64)
+    trace = traces.Trace(path)
+    assert len(trace) == len(recorder)
+    assert trace.leg_count == 3
+    assert trace.leg_of(0) == 0 and trace.leg_of(len(trace)) == 2
+    for step in list(range(0, len(trace) + 1, 37)) + [64, 128, len(trace)]:
+        assert np.array_equal(trace.state_at(step), replay(initial, recorder, step))
+    indices, codes = trace.events(100, 400)
+    assert list(indices) == list(recorder.indices[100:400])
+    assert list(codes) == list(recorder.codes[100:400])
+
+
+def test_recorded_route_round_trip(tmp_path):
+    state = np.full((40, 60), cellgrid.FREE, dtype=np.uint8)
+    state[5:35, 30] = cellgrid.OBSTACLE
+    points = [(0, 0), (20, 59), (39, 0)]
+    for point, code in zip(points, (cellgrid.START, cellgrid.STOP, cellgrid.END)):
+        state[point] = code
+    recorder = traces.record_route(state, points)
+    path = str(tmp_path / "route.pft")
+    recorder.save(path)
+    trace = traces.Trace(path)
+    assert trace.leg_count == 2
+    final = trace.state_at(len(trace))
+    assert np.array_equal(final, replay(state, recorder, len(recorder)))
+    assert np.array_equal(final == cellgrid.OBSTACLE, state == cellgrid.OBSTACLE)
+    assert (final == cellgrid.PATH).any()
+    assert np.array_equal(trace.state_at(0), state)
+
+
+def test_rejects_files_that_are_not_traces(tmp_path):
+    path = tmp_path / "map.npy"
+    np.save(path, np.zeros((4, 4), dtype=bool))
+    with pytest.raises(ValueError):
+        traces.Trace(str(path))
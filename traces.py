@@ -0,0 +1,211 @@
+from array import array
+import argparse
+import sys
+
+import numpy as np
+
+import cellgrid
+import engine
+import maps
+
+MAGIC = b"PFTRACE1"
+ESCAPE = -32768
+MIN_KEYFRAME = 4096
+ALIGN = 8
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("rows", "<i8"),
+    ("cols", "<i8"),
+    ("events", "<i8"),
+    ("keyframe", "<i8"),
+    ("overflow", "<i8"),
+    ("legs", "<i8"),
+])
+
+
+def padding(size):
+    return -size % ALIGN
+
+
+class TraceRecorder:
+    def __init__(self, initial):
+        self.initial = np.array(initial, dtype=np.uint8)
+        self.indices = array("q")
+        self.codes = array("B")
+        self.legs = array("q", [0])
+
+    def __len__(self):
+        return len(self.codes)
+
+    def record(self, index, code):
+        self.indices.append(index)
+        self.codes.append(code)
+
+    def end_leg(self):
+        self.legs.append(len(self.codes))
+
+    def save(self, path, keyframe=None):
+        rows, cols = self.initial.shape
+        cells = rows * cols
+        keyframe = keyframe or max(MIN_KEYFRAME, cells)
+        indices = np.frombuffer(self.indices, dtype=np.int64) if self.indices else np.zeros(0, dtype=np.int64)
+        codes = np.frombuffer(self.codes, dtype=np.uint8) if self.codes else np.zeros(0, dtype=np.uint8)
+        deltas = np.diff(indices, prepend=0)
+        bases = np.concatenate(([0], indices[keyframe - 1::keyframe]))[:len(codes) // keyframe + 1]
+        escaped = (deltas <= ESCAPE) | (deltas > -ESCAPE - 1)
+        positions = np.flatnonzero(escaped).astype(np.int64)
+        packed = deltas.astype(np.int16)
+        packed[escaped] = ESCAPE
+        legs = np.frombuffer(self.legs, dtype=np.int64)
+        header = np.array([(MAGIC, rows, cols, len(codes), keyframe, len(positions), len(legs) - 1)], dtype=HEADER)
+        with open(path, "wb") as handle:
+            for section in (header, codes, packed, positions, deltas[escaped], legs, bases):
+                data = section.tobytes()
+                handle.write(data + bytes(padding(len(data))))
+            state = self.initial.ravel().copy()
+            handle.write(state.tobytes())
+            for begin in range(keyframe, len(codes) + 1, keyframe):
+                state[indices[begin - keyframe:begin]] = codes[begin - keyframe:begin]
+                handle.write(state.tobytes())
+
+
+class Trace:
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=HEADER, count=1)
+        if len(header) != 1 or header["magic"][0] != MAGIC:
+            raise ValueError("%s: not a search trace" % path)
+        header = header[0]
+        self.path = path
+        self.rows = int(header["rows"])
+        self.cols = int(header["cols"])
+        self.keyframe = int(header["keyframe"])
+        events = int(header["events"])
+        overflow = int(header["overflow"])
+        self.offset = HEADER.itemsize + padding(HEADER.itemsize)
+        self.codes = self.section(np.uint8, events)
+        self.deltas = self.section(np.int16, events)
+        self.positions = self.section(np.int64, overflow)
+        self.overflow = self.section(np.int64, overflow)
+        self.legs = self.section(np.int64, int(header["legs"]) + 1)
+        self.bases = self.section(np.int64, events // self.keyframe + 1)
+        self.snapshots = self.section(np.uint8, len(self.bases) * self.rows * self.cols)
+        self.snapshots = self.snapshots.reshape(-1, self.rows * self.cols)
+        self.cursor = (None, 0)
+
+    def section(self, dtype, count):
+        size = np.dtype(dtype).itemsize * count
+        if count:
+            data = np.memmap(self.path, dtype=dtype, mode="r", offset=self.offset, shape=(count,))
+        else:
+            data = np.zeros(0, dtype=dtype)
+        self.offset += size + padding(size)
+        return data
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def leg_count(self):
+        return len(self.legs) - 1
+
+    def leg_of(self, step):
+        return min(int(np.searchsorted(self.legs, step, side="right")) - 1, self.leg_count - 1)
+
+    def indices(self, begin, end):
+        if self.cursor[0] == begin:
+            first, base = self.cursor
+        else:
+            first = begin - begin % self.keyframe
+            base = self.bases[first // self.keyframe]
+        deltas = self.deltas[first:end].astype(np.int64)
+        lo, hi = np.searchsorted(self.positions, (first, end))
+        deltas[self.positions[lo:hi] - first] = self.overflow[lo:hi]
+        indices = base + np.cumsum(deltas)
+        if len(indices):
+            self.cursor = (end, int(indices[-1]))
+        return indices[begin - first:]
+
+    def events(self, begin, end):
+        return self.indices(begin, end), self.codes[begin:end]
+
+    def state_at(self, step):
+        first = step // self.keyframe
+        state = self.snapshots[first].copy()
+        indices, codes = self.events(first * self.keyframe, step)
+        state[indices] = codes
+        return state.reshape(self.rows, self.cols)
+
+
+def record_route(state, points, algorithm="astar", search=None, weights=None):
+    state = np.asarray(state, dtype=np.uint8)
+    cols = state.shape[1]
+    grid = engine.OccupancyGrid(state == cellgrid.OBSTACLE, weights)
+    if search is None:
+        def search(start, end):
+            return engine.search_steps(grid, start, end, algorithm)
+    recorder = TraceRecorder(state)
+    current = bytearray(state.tobytes())
+    def record(flat, code):
+        if not cellgrid.START <= current[flat] <= cellgrid.PATH and current[flat] != code:
+            current[flat] = code
+            recorder.record(flat, code)
+    for i in range(len(points) - 1):
+        search_states = cellgrid.SEARCH_STATES[i % cellgrid.PALETTES]
+        steps = search(points[i], points[i + 1])
+        while True:
+            try:
+                kind, index = next(steps)
+            except StopIteration as stop:
+                result = stop.value
+                break
+            row, col = grid.pos(index)
+            record(row * cols + col, search_states[kind])
+        if result.found:
+            for row, col in result.path:
+                record(row * cols + col, cellgrid.PATH)
+        recorder.end_leg()
+        if not result.found:
+            break
+    return recorder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record a search trace for later playback.")
+    parser.add_argument("map", help="MovingAI .map, .npy or raw binary occupancy grid")
+    parser.add_argument("output")
+    parser.add_argument("--shape", type=lambda text: tuple(int(v) for v in text.split("x")),
+                        help="ROWSxCOLS of a raw binary map")
+    parser.add_argument("--points", help="route as ROW,COL;ROW,COL;... (default: two far corners "
+                                         "of the largest open region)")
+    parser.add_argument("--algorithm", default="astar", choices=sorted(engine.ALGORITHMS))
+    parser.add_argument("--weights", help=".npy or raw uint8 terrain costs from 1 to 9 (0 blocks a cell)")
+    parser.add_argument("--keyframe", type=int, help="events between state snapshots")
+    args = parser.parse_args(argv)
+
+    blocked = np.asarray(maps.load_map(args.map, args.shape), dtype=bool)
+    weights = None
+    if args.weights:
+        try:
+            walls, weights = maps.load_weights(args.weights, args.shape, cellgrid.MAX_WEIGHT)
+        except ValueError as error:
+            parser.error(str(error))
+        blocked = blocked | walls
+    if args.points:
+        points = [tuple(int(v) for v in point.split(",")) for point in args.points.split(";")]
+    else:
+        points = list(maps.endpoints(blocked))
+    state = np.where(blocked, cellgrid.OBSTACLE, cellgrid.FREE).astype(np.uint8)
+    if weights is not None:
+        state[~blocked] = cellgrid.TERRAIN[weights[~blocked]]
+    state[points[0]] = cellgrid.START
+    for stop in points[1:-1]:
+        state[stop] = cellgrid.STOP
+    state[points[-1]] = cellgrid.END
+    recorder = record_route(state, points, args.algorithm, weights=weights)
+    recorder.save(args.output, args.keyframe)
+    print("%s: %d events over %d legs" % (args.output, len(recorder), len(recorder.legs) - 1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())